@@ -12,6 +12,8 @@ from .ordering import (
     fct_len,
     fct_sort,
     fct_sort_custom,
+    fct_lump_n,
+    fct_lump_prop,
 )
 
 from .replacing import (
@@ -39,5 +41,12 @@ from .other import (
     fct_insert,
     fct_pairs,
     fct_union,
+    fct_intersect,
+    fct_setdiff,
+    fct_compact,
     # Other useful functions
 )
+
+from .encoding import (
+    fct_onehot,
+)
@@ -0,0 +1,394 @@
+# fctutils/cli.py
+
+import argparse
+import ast
+import os
+import queue
+import re
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .merging import fct_merge_similar
+from .ordering import _keep_prop, _keep_top_n
+from .parallel import code_dtype, from_codes, remap_codes
+from .replacing import fct_anon, fct_replace, fct_replace_pattern
+from .window import WindowedCounts
+
+USAGE_EXAMPLE = """
+example:
+  fctutils events.csv out.csv --op city:merge_similar:max_distance=0.1 --op city:lump_n:n=1000 \\
+      --op device:replace:old=iphone,new=iOS --workers 8 --max-memory 2GB
+"""
+
+
+class _Op:
+    """
+    One factor operation of a column chain.
+
+    Stateful operations see the whole column in fit() (chunk by chunk) before any
+    chunk is transformed; finish() is called once the fit pass is over.
+    """
+
+    stateful = False
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+    def fit(self, series):
+        pass
+
+    def finish(self):
+        pass
+
+    def apply(self, series):
+        raise NotImplementedError
+
+
+class _CountingOp(_Op):
+    stateful = True
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.window = WindowedCounts([], n_buckets=1)
+
+    def fit(self, series):
+        self.window.add(series)
+
+
+class _Count(_CountingOp):
+    def finish(self):
+        self.categories = self.window.order(self.kwargs.get('decreasing', True))
+
+    def apply(self, series):
+        return series.cat.set_categories(self.categories, ordered=True)
+
+
+class _Lump(_CountingOp):
+    def finish(self):
+        window = self.window
+        counts = window.counts().to_numpy()
+        if 'min_count' in self.kwargs:
+            keep = counts >= self.kwargs['min_count']
+        elif 'n' in self.kwargs:
+            keep = _keep_top_n(counts, self.kwargs['n'])
+        else:
+            keep = _keep_prop(counts, self.kwargs['prop'])
+        kept = np.flatnonzero(keep)
+        kept = kept[np.argsort(-counts[kept], kind='stable')]
+        self.kept = window.categories[kept]
+        self.categories = self.kept.append(pd.Index([self.kwargs.get('other_level', 'Other')]))
+
+    def apply(self, series):
+        positions = self.kept.get_indexer(series.cat.categories)
+        lut = np.where(positions >= 0, positions, len(self.kept))
+        # Like fct_lump_min, lump_min also lumps missing values; lump_n and lump_prop keep them.
+        na_code = len(self.kept) if 'min_count' in self.kwargs else -1
+        lut = np.append(lut, na_code).astype(code_dtype(len(self.categories)))
+        codes = remap_codes(series.cat.codes.to_numpy(), lut)
+        return from_codes(series, codes, self.categories)
+
+
+class _Inorder(_Op):
+    stateful = True
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.seen = {}
+
+    def fit(self, series):
+        for level in pd.unique(series.dropna()):
+            self.seen.setdefault(level, None)
+
+    def finish(self):
+        self.categories = list(self.seen)
+
+    def apply(self, series):
+        return series.cat.set_categories(self.categories, ordered=True)
+
+
+class _MergeSimilar(_Inorder):
+    def finish(self):
+        levels = pd.Series(list(self.seen), dtype='category')
+        merged = fct_merge_similar(levels, **self.kwargs)
+        self.mapping = dict(zip(levels.astype(object), merged.astype(object)))
+        self.categories = list(dict.fromkeys(self.mapping.values()))
+
+    def apply(self, series):
+        series = fct_replace(series, mapping=self.mapping)
+        return series.cat.set_categories(self.categories)
+
+
+class _Replace(_Op):
+    def apply(self, series):
+        return fct_replace(series, mapping={self.kwargs['old']: self.kwargs['new']})
+
+
+class _ReplacePattern(_Op):
+    def apply(self, series):
+        return fct_replace_pattern(series, **self.kwargs)
+
+
+class _Anon(_Op):
+    def __init__(self, **kwargs):
+        if 'key' not in kwargs:
+            raise ValueError("anon needs key=... so that every chunk gets the same labels.")
+        super().__init__(**kwargs)
+
+    def apply(self, series):
+        return fct_anon(series, **self.kwargs)
+
+
+OPERATIONS = {
+    'count': _Count,
+    'lump_min': _Lump,
+    'lump_n': _Lump,
+    'lump_prop': _Lump,
+    'inorder': _Inorder,
+    'merge_similar': _MergeSimilar,
+    'replace': _Replace,
+    'replace_pattern': _ReplacePattern,
+    'anon': _Anon,
+}
+
+
+def parse_op(spec):
+    """
+    Parse 'column:operation[:key=value,...]' into (column, operation instance).
+    """
+    parts = spec.split(':', 2)
+    if len(parts) < 2 or parts[1] not in OPERATIONS:
+        raise ValueError(f"Invalid operation '{spec}'; expected column:operation[:key=value,...] "
+                         f"with operation in {sorted(OPERATIONS)}.")
+    column, name = parts[0], parts[1]
+    kwargs = {}
+    if len(parts) == 3 and parts[2]:
+        for item in parts[2].split(','):
+            key, _, value = item.partition('=')
+            try:
+                kwargs[key] = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                kwargs[key] = value
+    if name in ('lump_min', 'lump_n', 'lump_prop'):
+        required = {'lump_min': 'min_count', 'lump_n': 'n', 'lump_prop': 'prop'}[name]
+        if required not in kwargs:
+            raise ValueError(f"{name} needs {required}=...")
+    return column, OPERATIONS[name](**kwargs)
+
+
+def parse_size(text):
+    """
+    Parse a memory size such as '512MB' or '2GB' into bytes.
+    """
+    match = re.fullmatch(r'\s*([\d.]+)\s*([KMGT]?)B?\s*', text.upper())
+    if not match:
+        raise ValueError(f"Invalid size '{text}'.")
+    scale = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}[match.group(2)]
+    return int(float(match.group(1)) * scale)
+
+
+def _file_format(path, fmt):
+    if fmt:
+        return fmt
+    return 'parquet' if path.lower().endswith(('.parquet', '.pq')) else 'csv'
+
+
+def read_chunks(path, fmt, chunksize, columns=None):
+    """
+    Iterate over a CSV or Parquet file as DataFrame chunks.
+    """
+    if fmt == 'parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files requires pyarrow.")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=columns)
+
+
+class _ChunkWriter:
+    """
+    Write DataFrame chunks one after the other to a CSV or Parquet file.
+    """
+
+    def __init__(self, path, fmt):
+        self.path = path
+        self.fmt = fmt
+        self._writer = None
+        self._schema = None
+        self._first = True
+
+    def write(self, chunk):
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._writer is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                # Chunks have their own categories, so the dictionary index width of the
+                # first chunk (int8 for up to 127 levels) cannot be kept for the file.
+                self._schema = pa.schema([
+                    field.with_type(pa.dictionary(pa.int32(), field.type.value_type, field.type.ordered))
+                    if pa.types.is_dictionary(field.type) else field
+                    for field in table.schema
+                ], metadata=table.schema.metadata)
+                table = table.cast(self._schema)
+                self._writer = pq.ParquetWriter(self.path, self._schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False)
+            self._writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _prefetch(iterable, maxsize):
+    """
+    Run an iterator in a background thread, keeping at most maxsize items ahead.
+    """
+    items = queue.Queue(maxsize=maxsize)
+    done = object()
+    errors = []
+
+    def produce():
+        try:
+            for item in iterable:
+                items.put(item)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            items.put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = items.get()
+        if item is done:
+            break
+        yield item
+    if errors:
+        raise errors[0]
+
+
+def _as_factor(series):
+    if pd.api.types.is_categorical_dtype(series):
+        return series
+    return series.astype('category')
+
+
+def _apply_chain(series, chain):
+    series = _as_factor(series)
+    for op in chain:
+        series = op.apply(series)
+    return series
+
+
+def fit(chains, path, fmt, chunksize):
+    """
+    Learn the state of the stateful operations, one pass per chain depth.
+
+    Pass k reads only the columns that have a k-th stateful operation, applies the
+    operations before it and feeds the result to its fit().
+    """
+    depth = 0
+    while True:
+        targets = {}
+        for column, chain in chains.items():
+            stateful = [i for i, op in enumerate(chain) if op.stateful]
+            if len(stateful) > depth:
+                targets[column] = stateful[depth]
+        if not targets:
+            return
+        for chunk in _prefetch(read_chunks(path, fmt, chunksize, list(targets)), maxsize=2):
+            for column, position in targets.items():
+                chain = chains[column]
+                chain[position].fit(_apply_chain(chunk[column], chain[:position]))
+        for column, position in targets.items():
+            chains[column][position].finish()
+        depth += 1
+
+
+def transform(chains, input_path, input_fmt, output_path, output_fmt, chunksize,
+              workers=1, max_memory=1 << 30):
+    """
+    Stream the input through the operation chains and write the output chunk by chunk.
+
+    Reading (background thread), transforming (worker threads) and writing (calling
+    thread) overlap. The number of chunks in flight is bounded so that their estimated
+    size stays within max_memory.
+    """
+    def work(chunk):
+        chunk = chunk.copy(deep=False)
+        for column, chain in chains.items():
+            chunk[column] = _apply_chain(chunk[column], chain)
+        return chunk
+
+    writer = _ChunkWriter(output_path, output_fmt)
+    pending = deque()
+    max_pending = None
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for chunk in _prefetch(read_chunks(input_path, input_fmt, chunksize), maxsize=1):
+                if max_pending is None:
+                    # Input and output copies of each chunk, plus the prefetched one.
+                    chunk_bytes = 2 * max(int(chunk.memory_usage(deep=True).sum()), 1)
+                    max_pending = int(max(1, min(2 * workers, max_memory // chunk_bytes - 1)))
+                pending.append(pool.submit(work, chunk))
+                while len(pending) >= max_pending:
+                    writer.write(pending.popleft().result())
+            while pending:
+                writer.write(pending.popleft().result())
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    """
+    Entry point of the fctutils command-line tool.
+    """
+    parser = argparse.ArgumentParser(
+        prog='fctutils',
+        description='Apply chains of factor operations to columns of a large CSV or Parquet '
+                    'file, streaming it in chunks.',
+        epilog=USAGE_EXAMPLE,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('input', help='Input CSV or Parquet file.')
+    parser.add_argument('output', help='Output CSV or Parquet file.')
+    parser.add_argument('--op', action='append', required=True, metavar='COLUMN:OP[:KEY=VALUE,...]',
+                        help=f"Operation to apply, in order; one of {', '.join(OPERATIONS)}.")
+    parser.add_argument('--chunksize', type=int, default=100_000, help='Rows per chunk.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker threads transforming chunks.')
+    parser.add_argument('--max-memory', default='1GB', help='Peak memory target for chunks in flight.')
+    parser.add_argument('--input-format', choices=['csv', 'parquet'])
+    parser.add_argument('--output-format', choices=['csv', 'parquet'])
+    args = parser.parse_args(argv)
+
+    try:
+        chains = {}
+        for spec in args.op:
+            column, op = parse_op(spec)
+            chains.setdefault(column, []).append(op)
+        max_memory = parse_size(args.max_memory)
+    except ValueError as error:
+        parser.error(str(error))
+
+    input_fmt = _file_format(args.input, args.input_format)
+    output_fmt = _file_format(args.output, args.output_format)
+    fit(chains, args.input, input_fmt, args.chunksize)
+    transform(chains, args.input, input_fmt, args.output, output_fmt, args.chunksize,
+              workers=max(1, args.workers), max_memory=max_memory)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
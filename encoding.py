@@ -0,0 +1,89 @@
+# fctutils/encoding.py
+
+import numpy as np
+import pandas as pd
+
+from .parallel import cross_codes
+
+
+def fct_onehot(*factors, interactions=None, sep='_', dtype=np.uint8, n_jobs=1):
+    """
+    One-hot encode factors into a sparse CSR indicator matrix built from their codes.
+
+    Columns follow the current level order of each factor (so fct_count, fct_lump_min,
+    etc. decide the column order), factors are stacked left to right, and missing
+    values produce all-zero rows for their factor. Interaction columns only cover the
+    level pairs that actually occur.
+
+    Parameters:
+    - *factors: pandas Series (converted to categorical if needed), all of the same length.
+    - interactions: Optional list of (i, j) pairs of factor positions to cross.
+    - sep: String, separator between factor name and level in column names.
+    - dtype: numpy dtype of the stored ones.
+    - n_jobs: Integer, number of worker processes used to cross codes (-1 for all CPUs).
+
+    Returns:
+    - Tuple (matrix, columns): a scipy.sparse.csr_matrix of shape (rows, columns) and
+      the list of column names.
+    """
+    try:
+        from scipy import sparse
+    except ImportError:
+        raise ImportError("fct_onehot requires scipy.")
+
+    factors = [f if pd.api.types.is_categorical_dtype(f) else f.astype('category') for f in factors]
+    if not factors:
+        raise ValueError("At least one factor is required.")
+    n_rows = len(factors[0])
+    if any(len(f) != n_rows for f in factors):
+        raise ValueError("All factors must have the same length.")
+
+    names = [str(f.name) if f.name is not None else f"x{i}" for i, f in enumerate(factors)]
+    blocks = []
+    widths = []
+    columns = []
+    for name, factor in zip(names, factors):
+        blocks.append(factor.cat.codes.to_numpy())
+        widths.append(len(factor.cat.categories))
+        columns.extend(f"{name}{sep}{level}" for level in factor.cat.categories)
+
+    for i, j in interactions or []:
+        categories1, categories2 = factors[i].cat.categories, factors[j].cat.categories
+        n1, n2 = len(categories1), len(categories2)
+        pair_codes, observed = cross_codes(factors[i].cat.codes.to_numpy(), factors[j].cat.codes.to_numpy(),
+                                           n1, n2, n_jobs=n_jobs)
+        level1, level2 = observed // (n2 + 1), observed % (n2 + 1)
+        # Pairs involving a missing value (the extra level n1 or n2) get no column.
+        valid = (level1 < n1) & (level2 < n2)
+        lut = np.full(len(observed) + 1, -1, dtype=np.int64)
+        lut[:-1][valid] = np.arange(valid.sum())
+        blocks.append(lut[pair_codes])
+        widths.append(int(valid.sum()))
+        columns.extend(f"{names[i]}{sep}{categories1[a]}:{names[j]}{sep}{categories2[b]}"
+                       for a, b in zip(level1[valid], level2[valid]))
+
+    n_columns = len(columns)
+    index_dtype = np.int32 if n_columns < np.iinfo(np.int32).max else np.int64
+
+    if len(blocks) == 1:
+        codes = blocks[0]
+        valid = codes >= 0
+        indices = codes[valid].astype(index_dtype)
+        row_counts = valid.astype(np.int64)
+    else:
+        cols = np.empty((n_rows, len(blocks)), dtype=index_dtype)
+        offset = 0
+        for b, (codes, width) in enumerate(zip(blocks, widths)):
+            # Widen before adding the offset: factor codes can be as narrow as int8.
+            cols[:, b] = np.where(codes >= 0, codes.astype(index_dtype) + offset, -1)
+            offset += width
+        valid = cols >= 0
+        # Row-major selection keeps the column indices sorted within each row.
+        indices = cols[valid]
+        row_counts = valid.sum(axis=1)
+
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(row_counts, out=indptr[1:])
+    data = np.ones(len(indices), dtype=dtype)
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(n_rows, n_columns))
+    return matrix, columns
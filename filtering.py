@@ -1,3 +1,11 @@
+# fctutils/filtering.py
+
+import numpy as np
+import pandas as pd
+
+from .levels import LevelBuffer, LevelIndex, is_compact
+from .parallel import map_levels
+
 def fct_filter_freq(factor_series, min_freq=1, na_rm=False, return_info=False):
     """
     Filters out factor levels that occur less than a specified frequency threshold.
@@ -37,49 +45,132 @@ def fct_filter_freq(factor_series, min_freq=1, na_rm=False, return_info=False):
         return filtered_series
 
 
-def fct_filter_pos(factor_series, positions, char, case=False):
+def fct_filter_pos(factor_series, positions, char, case=False, mode='drop'):
     """
     Removes factor levels where a specified character appears at specified positions within the levels.
+
+    mode: 'drop' removes the rows, 'na' keeps the rows (and index) as missing values,
+    'mask' returns a LevelMask of the rows to keep.
     """
-    levels = factor_series.cat.categories.tolist()
+    categories = factor_series.cat.categories
+    mask = LevelBuffer.of(categories).char_mask(positions, char, case) if is_compact(categories) else None
+    if mask is None:
+        mask = LevelIndex.of(categories).char_mask(positions, char, case)
+    return _drop_levels(factor_series, mask, keep_na=True, mode=mode)
+# fctutils/filtering.py
 
-    def char_at_positions(s):
-        return [s[i - 1] if i - 1 < len(s) else '' for i in positions]
+def fct_remove_levels(factor_series, levels_to_remove, mode='drop'):
+    """
+    Removes specified levels from a factor vector, keeping the remaining levels and their order unchanged.
 
-    if not case:
-        char = char.lower()
+    mode: 'drop' removes the rows, 'na' keeps the rows (and index) as missing values,
+    'mask' returns a LevelMask of the rows to keep.
+    """
+    index = LevelIndex.of(factor_series.cat.categories)
+    codes = index.get_codes(levels_to_remove)
+    if (codes < 0).any():
+        missing = [level for level, code in zip(levels_to_remove, codes) if code < 0]
+        raise ValueError(f"Levels {missing} are not categories of the factor.")
 
-    levels_to_remove = []
-    for level in levels:
-        chars = char_at_positions(level)
-        if not case:
-            chars = [c.lower() for c in chars]
-        if char in chars:
-            levels_to_remove.append(level)
+    remove = np.zeros(len(index), dtype=bool)
+    remove[codes] = True
+    return _drop_levels(factor_series, remove, keep_na=True, mode=mode)
 
-    filtered_series = factor_series[~factor_series.isin(levels_to_remove)]
-    filtered_series = filtered_series.cat.remove_categories(levels_to_remove)
-    return filtered_series
-# fctutils/filtering.py
 
-def fct_remove_levels(factor_series, levels_to_remove):
+class LevelMask:
     """
-    Removes specified levels from a factor vector, keeping the remaining levels and their order unchanged.
+    Lazy boolean row mask, True where the level of a row is kept.
+
+    The mask is computed from the factor codes on first use, so one filter can be
+    applied to a whole DataFrame at once instead of filtering every column.
+
+    Parameters:
+    - codes: Integer array of category codes (-1 for NA).
+    - keep: Boolean array with one entry per category plus a final entry for NA.
+    - index: pandas Index of the factor.
     """
-    filtered_series = factor_series[~factor_series.isin(levels_to_remove)]
-    filtered_series = filtered_series.cat.remove_categories(levels_to_remove)
-    return filtered_series
+
+    def __init__(self, codes, keep, index):
+        self.codes = codes
+        self.keep = keep
+        self.index = index
+        self._values = None
+
+    @property
+    def values(self):
+        if self._values is None:
+            self._values = self.keep[self.codes]
+        return self._values
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    def to_series(self):
+        """
+        The mask as a boolean pandas Series aligned with the factor.
+        """
+        return pd.Series(self.values, index=self.index)
+
+    def apply(self, data):
+        """
+        Select the kept rows of a Series or DataFrame aligned with the factor.
+        """
+        return data[self.values]
+
+
+def _drop_levels(factor_series, remove, keep_na, mode='drop'):
+    """
+    Remove the levels flagged in remove, dropping their rows or turning them into NA.
+
+    Parameters:
+    - factor_series: pandas Series with categorical dtype.
+    - remove: Boolean array with one entry per category.
+    - keep_na: Boolean, if True, rows with missing values are kept in 'drop' and 'mask' modes.
+    - mode: 'drop', 'na' or 'mask'.
+
+    Returns:
+    - pandas Series with the remaining categories, or a LevelMask in 'mask' mode.
+    """
+    if mode not in ('drop', 'na', 'mask'):
+        raise ValueError("mode must be 'drop', 'na' or 'mask'.")
+
+    keep = ~remove
+    codes = factor_series.cat.codes.to_numpy()
+    if mode == 'mask':
+        return LevelMask(codes, np.append(keep, keep_na), factor_series.index)
+
+    lut = np.full(len(keep) + 1, -1, dtype=np.int64)
+    lut[:-1][keep] = np.arange(keep.sum())
+    index = factor_series.index
+    if mode == 'drop':
+        rows = np.append(keep, keep_na)[codes]
+        codes = codes[rows]
+        index = index[rows]
+
+    # A single gather through the lookup table; removed levels become -1 (NA).
+    categorical = pd.Categorical.from_codes(lut[codes],
+                                            categories=factor_series.cat.categories[keep],
+                                            ordered=factor_series.cat.ordered)
+    return pd.Series(categorical, index=index, name=factor_series.name)
 # fctutils/filtering.py
 
-def fct_filter_func(factor_series, filter_func):
+def fct_filter_func(factor_series, filter_func, mode='drop', n_jobs=1, executor='thread', cache=None):
     """
     Removes levels from a factor vector based on a user-defined function.
+
+    mode: 'drop' removes the rows, 'na' keeps the rows (and index) as missing values,
+    'mask' returns a LevelMask of the rows to keep.
+
+    filter_func is evaluated over the levels in batches on n_jobs 'thread' or 'process'
+    workers; pass a LevelCache as cache to reuse results across calls.
     """
     levels = factor_series.cat.categories.tolist()
-    levels_to_keep = [level for level in levels if filter_func(level)]
-    filtered_series = factor_series[factor_series.isin(levels_to_keep)]
-    filtered_series = filtered_series.cat.set_categories(levels_to_keep)
-    return filtered_series
+    results = map_levels(filter_func, levels, n_jobs=n_jobs, executor=executor, cache=cache)
+    keep = np.fromiter((bool(result) for result in results), dtype=bool, count=len(levels))
+    return _drop_levels(factor_series, ~keep, keep_na=False, mode=mode)
 
 # fctutils/filtering.py
 
@@ -0,0 +1,273 @@
+# fctutils/levels.py
+
+import weakref
+
+import numpy as np
+import pandas as pd
+
+# LevelIndex and LevelBuffer objects cached by the identity of the categories they were built from.
+_INDEX_CACHE = {}
+
+
+def _cached(cls, categories):
+    """
+    Return the cached cls instance for categories, building it on first use.
+    """
+    key = (cls, id(categories))
+    entry = _INDEX_CACHE.get(key)
+    if entry is not None and entry[0]() is categories:
+        return entry[1]
+
+    index = cls(categories)
+    try:
+        ref = weakref.ref(categories, lambda _: _INDEX_CACHE.pop(key, None))
+    except TypeError:
+        return index
+    _INDEX_CACHE[key] = (ref, index)
+    return index
+
+
+class LevelIndex:
+    """
+    Lookup structure built once from the categories of a factor.
+
+    It holds a label -> code hash map, the labels in sorted order for prefix queries
+    and, built on first use, one character array per queried position. Use
+    LevelIndex.of(categories) to share one index across calls on the same categories.
+
+    Parameters:
+    - categories: pandas Index (or list) of factor levels.
+    """
+
+    def __init__(self, categories):
+        self.categories = pd.Index(categories)
+        self.codes = dict(zip(self.categories, range(len(self.categories))))
+        self._sorted_codes = None
+        self._sorted_labels = None
+        self._chars = {}
+
+    @classmethod
+    def of(cls, categories):
+        """
+        Return the cached LevelIndex for categories, building it on first use.
+
+        The cache entry is dropped when the categories object is garbage collected.
+        """
+        return _cached(cls, categories)
+
+    def __len__(self):
+        return len(self.categories)
+
+    def __contains__(self, label):
+        return label in self.codes
+
+    def get(self, label, default=-1):
+        """
+        Code of a single label, or default if it is not a level.
+        """
+        return self.codes.get(label, default)
+
+    def get_codes(self, labels):
+        """
+        Codes of several labels as a numpy array, -1 for labels that are not levels.
+        """
+        codes = self.codes
+        return np.fromiter((codes.get(label, -1) for label in labels), dtype=np.int64, count=len(labels))
+
+    def prefix_codes(self, prefix):
+        """
+        Codes of all levels starting with prefix, in category order.
+
+        The labels are sorted once, so each query is a binary search plus the matches.
+        """
+        if self._sorted_codes is None:
+            labels = self.categories.astype(str).to_numpy(dtype=object)
+            self._sorted_codes = np.argsort(labels, kind='stable')
+            self._sorted_labels = labels[self._sorted_codes]
+        start = np.searchsorted(self._sorted_labels, prefix, side='left')
+        stop = np.searchsorted(self._sorted_labels, prefix + chr(0x10FFFF), side='left')
+        return np.sort(self._sorted_codes[start:stop])
+
+    def chars_at(self, position, case=True):
+        """
+        Character at a 1-based position of every level ('' where the level is shorter).
+
+        Parameters:
+        - position: Integer, 1-based position.
+        - case: Boolean, if False, the characters are lower-cased.
+
+        Returns:
+        - numpy array of strings, one per level.
+        """
+        key = (position, case)
+        if key not in self._chars:
+            chars = pd.Series(self.categories.astype(str)).str[position - 1].fillna('')
+            if not case:
+                chars = chars.str.lower()
+            self._chars[key] = chars.to_numpy(dtype=str)
+        return self._chars[key]
+
+    def char_mask(self, positions, char, case=False):
+        """
+        Boolean mask over the levels where char appears at any of the 1-based positions.
+        """
+        mask = np.zeros(len(self), dtype=bool)
+        if list(positions) == [1] and case and len(char) == 1:
+            # The first character is a one-character prefix.
+            mask[self.prefix_codes(char)] = True
+            return mask
+
+        if not case:
+            char = char.lower()
+        for position in positions:
+            mask |= self.chars_at(position, case) == char
+        return mask
+
+
+def is_compact(categories):
+    """
+    Whether categories are strings stored in Arrow (see fct_compact).
+    """
+    dtype = categories.dtype
+    if isinstance(dtype, pd.StringDtype):
+        return dtype.storage != 'python'
+    if isinstance(dtype, pd.ArrowDtype):
+        import pyarrow as pa
+        return pa.types.is_string(dtype.pyarrow_dtype) or pa.types.is_large_string(dtype.pyarrow_dtype)
+    return False
+
+
+class LevelBuffer:
+    """
+    The levels of a factor as one contiguous UTF-8 byte buffer plus an offsets array.
+
+    Level i is data[offsets[i]:offsets[i + 1]]. For Arrow-backed categories the buffers
+    are used as they are, without a copy; other categories are encoded once. Scans over
+    the levels (lengths, characters at positions, character frequencies) are numpy
+    operations on the buffer and create no Python object per level. Use
+    LevelBuffer.of(categories) to share one buffer across calls on the same categories.
+
+    Parameters:
+    - categories: pandas Index (or list) of string levels.
+    """
+
+    def __init__(self, categories):
+        if is_compact(categories):
+            import pyarrow as pa
+            array = pa.array(categories.array)
+            if isinstance(array, pa.ChunkedArray):
+                array = array.combine_chunks()
+            offset_dtype = np.int64 if pa.types.is_large_string(array.type) else np.int32
+            buffers = array.buffers()
+            offsets = np.frombuffer(buffers[1], dtype=offset_dtype)[array.offset:array.offset + len(array) + 1]
+            data = np.frombuffer(buffers[2], dtype=np.uint8) if buffers[2] is not None else np.empty(0, np.uint8)
+            self.offsets = offsets.astype(np.int64, copy=False)
+            self.data = data[:self.offsets[-1]] if len(self.offsets) else data[:0]
+        else:
+            encoded = [str(level).encode('utf-8') for level in categories]
+            self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=self.offsets[1:])
+            self.data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        if len(self.offsets) == 0:
+            self.offsets = np.zeros(1, dtype=np.int64)
+        self.is_ascii = not len(self.data) or int(self.data.max()) < 0x80
+        self._chars = {}
+
+    @classmethod
+    def of(cls, categories):
+        """
+        Return the cached LevelBuffer for categories, building it on first use.
+        """
+        return _cached(cls, categories)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.offsets.nbytes
+
+    def chars(self, case=True):
+        """
+        Characters of all levels and the character offsets of each level.
+
+        Parameters:
+        - case: Boolean, if False, the characters are lower-cased.
+
+        Returns:
+        - Tuple (chars, offsets): a numpy array of code points (uint8 for ASCII levels)
+          and an int64 array of len(self) + 1 offsets into it, or None if lower-casing
+          changes the number of characters (e.g. 'İ').
+        """
+        if case not in self._chars:
+            self._chars[case] = self._decode(case)
+        return self._chars[case]
+
+    def _decode(self, case):
+        if self.is_ascii:
+            chars = self.data
+            if not case:
+                upper = (chars >= ord('A')) & (chars <= ord('Z'))
+                chars = np.where(upper, chars + 32, chars).astype(np.uint8)
+            return chars, self.offsets
+
+        text = self.data.tobytes().decode('utf-8')
+        if not case:
+            lowered = text.lower()
+            if len(lowered) != len(text):
+                return None
+            text = lowered
+        chars = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        # Each character starts with exactly one byte that is not a continuation byte (10xxxxxx).
+        starts = np.zeros(len(self.data) + 1, dtype=np.int64)
+        np.cumsum((self.data & 0xC0) != 0x80, out=starts[1:])
+        return chars, starts[self.offsets]
+
+    def lengths(self):
+        """
+        Number of characters of each level.
+        """
+        return np.diff(self.chars()[1])
+
+    def chars_at(self, position, case=True):
+        """
+        Code point at a 1-based position of every level (0 where the level is shorter).
+
+        Returns None if lower-casing changes the number of characters.
+        """
+        decoded = self.chars(case)
+        if decoded is None:
+            return None
+        chars, offsets = decoded
+        index = offsets[:-1] + (position - 1)
+        valid = index < offsets[1:]
+        result = np.zeros(len(self), dtype=chars.dtype)
+        result[valid] = chars[index[valid]]
+        return result
+
+    def char_mask(self, positions, char, case=False):
+        """
+        Boolean mask over the levels where char appears at any of the 1-based positions.
+
+        Returns None if lower-casing changes the number of characters.
+        """
+        mask = np.zeros(len(self), dtype=bool)
+        if not case:
+            char = char.lower()
+        if len(char) != 1:
+            return None
+        for position in positions:
+            chars = self.chars_at(position, case)
+            if chars is None:
+                return None
+            mask |= chars == ord(char)
+        return mask
+
+    def slices(self):
+        """
+        Iterate over the UTF-8 bytes of each level as memoryview slices of the buffer.
+        """
+        view = memoryview(self.data)
+        offsets = self.offsets
+        for i in range(len(self)):
+            yield view[offsets[i]:offsets[i + 1]]
@@ -1,5 +1,14 @@
+# fctutils/merging.py
+
 from difflib import SequenceMatcher
 
+import numpy as np
+import pandas as pd
+
+from .other import fct_union
+from .parallel import code_dtype, cross_codes, from_codes, remap_codes
+from .registry import REGISTRY, dictionary_of
+
 def fct_merge_similar(factor_series, max_distance=1):
     """
     Merge levels of a factor that are similar based on string distance.
@@ -25,24 +34,40 @@ def fct_merge_similar(factor_series, max_distance=1):
     factor_series = factor_series.replace(mapping)
     factor_series = factor_series.astype('category')
     return factor_series
-def fct_concat(*factor_series_list):
+def fct_concat(*factor_series_list, n_jobs=1):
     """
     Combines multiple factor series into a single factor, unifying the levels.
 
+    Factors bound to the same registered dictionary are concatenated on their codes;
+    otherwise the levels are unified once and each input's codes are translated.
+
     Parameters:
     - *factor_series_list: Variable number of pandas Series with categorical dtype.
+    - n_jobs: Integer, number of worker processes used to translate the codes (-1 for all CPUs).
 
     Returns:
     - Concatenated pandas Series with unified categories.
     """
     all_series = [fs.astype('category') for fs in factor_series_list]
-    combined_categories = pd.api.types.union_categoricals(
-        [fs.cat.categories for fs in all_series])
-
-    concatenated_series = pd.concat(all_series).astype('category')
-    concatenated_series = concatenated_series.cat.set_categories(
-        combined_categories)
-    return concatenated_series
+    index = all_series[0].index.append([fs.index for fs in all_series[1:]])
+    names = {fs.name for fs in all_series}
+    name = names.pop() if len(names) == 1 else None
+
+    dictionaries = {id(dictionary_of(fs)): dictionary_of(fs) for fs in all_series}
+    if len(dictionaries) == 1 and None not in dictionaries.values():
+        dictionary = dictionaries.popitem()[1]
+        codes = np.concatenate([fs.cat.codes.to_numpy() for fs in all_series])
+        return dictionary.from_codes(codes, index=index, name=name)
+
+    union, translations = fct_union(*all_series, return_codes=True)
+    categories = union.cat.categories
+    lut_dtype = code_dtype(len(categories))
+    codes = np.concatenate([
+        remap_codes(fs.cat.codes.to_numpy(), np.append(translation, -1).astype(lut_dtype), n_jobs=n_jobs)
+        for fs, translation in zip(all_series, translations)
+    ])
+    categorical = pd.Categorical.from_codes(codes, categories=categories)
+    return pd.Series(categorical, index=index, name=name)
 # fctutils/merging.py
 
 def fct_combine(vector1, vector2, sort_by=1):
@@ -61,7 +86,7 @@ def fct_combine(vector1, vector2, sort_by=1):
 
 # fctutils/merging.py
 
-def fct_cross(factor_series1, factor_series2, sep='_'):
+def fct_cross(factor_series1, factor_series2, sep='_', n_jobs=1):
     """
     Create a new factor by combining levels from two factors.
 
@@ -69,6 +94,7 @@ def fct_cross(factor_series1, factor_series2, sep='_'):
     - factor_series1: pandas Series with categorical dtype.
     - factor_series2: pandas Series with categorical dtype.
     - sep: String, separator to use between levels.
+    - n_jobs: Integer, number of worker processes used to combine the codes (-1 for all CPUs).
 
     Returns:
     - pandas Series with new combined categories.
@@ -78,19 +104,56 @@ def fct_cross(factor_series1, factor_series2, sep='_'):
     if not pd.api.types.is_categorical_dtype(factor_series2):
         factor_series2 = factor_series2.astype('category')
 
-    combined = factor_series1.astype(str) + sep + factor_series2.astype(str)
-    combined = combined.astype('category')
-    return combined
+    if not factor_series1.index.equals(factor_series2.index):
+        combined = factor_series1.astype(str) + sep + factor_series2.astype(str)
+        return combined.astype('category')
+
+    # Work on codes: only the observed pairs are turned into labels.
+    categories1 = factor_series1.cat.categories
+    categories2 = factor_series2.cat.categories
+    n1, n2 = len(categories1), len(categories2)
+    labels1 = np.append(_str_labels(factor_series1), 'nan')
+    labels2 = np.append(_str_labels(factor_series2), 'nan')
+
+    def pair_labels(pairs):
+        return labels1[pairs // (n2 + 1)] + sep + labels2[pairs % (n2 + 1)]
+
+    # Categories are sorted, as they would be for a plain string factor.
+    pair_codes, observed = cross_codes(factor_series1.cat.codes.to_numpy(),
+                                       factor_series2.cat.codes.to_numpy(), n1, n2,
+                                       order=lambda pairs: np.argsort(pair_labels(pairs), kind='stable'),
+                                       n_jobs=n_jobs)
+    labels = pair_labels(observed)
+    if pd.Index(labels).has_duplicates:
+        # Different pairs can spell the same label when sep occurs inside a level.
+        label_codes, labels = pd.factorize(labels)
+        pair_codes = label_codes[pair_codes]
+    name = factor_series1.name if factor_series1.name == factor_series2.name else None
+    combined = from_codes(factor_series1, pair_codes, labels, ordered=False)
+    return combined.rename(name)
+
+def _str_labels(factor_series):
+    """
+    Levels as strings, reusing the cached labels of a bound dictionary.
+    """
+    dictionary = dictionary_of(factor_series)
+    if dictionary is not None:
+        return dictionary.str_labels
+    return factor_series.cat.categories.astype(str).to_numpy(dtype=object)
 
 # fctutils/merging.py
 
-def fct_match(factor_series1, factor_series2):
+def fct_match(factor_series1, factor_series2, n_jobs=1):
     """
     Match levels of factor_series1 to factor_series2, aligning categories.
 
+    If factor_series2 is bound to a registered dictionary, the result is bound to it
+    too; the code translation between two dictionaries is cached.
+
     Parameters:
     - factor_series1: pandas Series with categorical dtype.
     - factor_series2: pandas Series with categorical dtype.
+    - n_jobs: Integer, number of worker processes used to translate the codes (-1 for all CPUs).
 
     Returns:
     - pandas Series with levels matched to factor_series2.
@@ -100,6 +163,20 @@ def fct_match(factor_series1, factor_series2):
     if not pd.api.types.is_categorical_dtype(factor_series2):
         factor_series2 = factor_series2.astype('category')
 
+    target = dictionary_of(factor_series2)
+    if target is not None:
+        source = dictionary_of(factor_series1)
+        if source is target:
+            # A shallow copy shares the categories object, so it stays bound.
+            return factor_series1.copy(deep=False)
+        if source is not None:
+            lut = REGISTRY.translation(source, target)
+        else:
+            lut = np.append(target.categories.get_indexer(factor_series1.cat.categories), -1)
+            lut = lut.astype(code_dtype(len(target)))
+        codes = remap_codes(factor_series1.cat.codes.to_numpy(), lut, n_jobs=n_jobs)
+        return target.from_codes(codes, index=factor_series1.index, name=factor_series1.name)
+
     matched_series = factor_series1.cat.set_categories(factor_series2.cat.categories)
     return matched_series
 
@@ -1,7 +1,11 @@
 # fctutils/ordering.py
 
+import numpy as np
 import pandas as pd
 
+from .levels import LevelBuffer, is_compact
+from .parallel import code_dtype, count_codes, from_codes, map_levels, remap_codes
+
 def fct_pos(factor_series, positions, case=False, decreasing=False):
     """
     Reorder the levels of a factor (categorical series) based on characters at specified positions.
@@ -9,6 +13,11 @@ def fct_pos(factor_series, positions, case=False, decreasing=False):
     if not pd.api.types.is_categorical_dtype(factor_series):
         factor_series = factor_series.astype('category')
 
+    if is_compact(factor_series.cat.categories):
+        order = _compact_pos_order(LevelBuffer.of(factor_series.cat.categories), positions, case, decreasing)
+        if order is not None:
+            return _reorder_codes(factor_series, order)
+
     levels = factor_series.cat.categories.tolist()
 
     # Function to extract characters at specified positions
@@ -32,6 +41,33 @@ def fct_pos(factor_series, positions, case=False, decreasing=False):
     return factor_series
 
 
+def _compact_pos_order(buffer, positions, case, decreasing):
+    """
+    Level order of fct_pos computed on a LevelBuffer, or None if it cannot be.
+    """
+    columns = [buffer.chars_at(position, case) for position in positions]
+    if any(column is None for column in columns):
+        return None
+    keys = np.stack(columns, axis=1) if columns else np.zeros((len(buffer), 0), dtype=np.uint8)
+    # Characters past the end of a level are dropped from its key, so move them to the end.
+    keys = np.take_along_axis(keys, np.argsort(keys == 0, axis=1, kind='stable'), axis=1)
+    if decreasing:
+        keys = np.iinfo(keys.dtype).max - keys
+    return np.lexsort(keys.T[::-1])
+
+
+def _reorder_codes(factor_series, order):
+    """
+    Make categories[order] the (ordered) categories, rewriting the codes through a lookup table.
+    """
+    categories = factor_series.cat.categories
+    lut = np.empty(len(categories) + 1, dtype=code_dtype(len(categories)))
+    lut[order] = np.arange(len(categories))
+    lut[-1] = -1
+    codes = remap_codes(factor_series.cat.codes.to_numpy(), lut)
+    return from_codes(factor_series, codes, categories[order], ordered=True)
+
+
 def fct_count(data, column=None, decreasing=True):
     """
     Reorder levels of a factor based on the count of each level.
@@ -93,6 +129,16 @@ def fct_freq(factor_series, case=False, decreasing=True):
     """
     Reorder levels of a factor based on the total frequency of characters appearing in the vector.
     """
+    if is_compact(factor_series.cat.categories):
+        decoded = LevelBuffer.of(factor_series.cat.categories).chars(case)
+        if decoded is not None:
+            chars, offsets = decoded
+            # Score of a level = sum of the frequencies of its characters, as a prefix-sum difference.
+            scores = np.zeros(len(chars) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(chars)[chars], out=scores[1:])
+            scores = scores[offsets[1:]] - scores[offsets[:-1]]
+            return _reorder_codes(factor_series, np.argsort(-scores if decreasing else scores, kind='stable'))
+
     levels = factor_series.cat.categories.tolist()
     text = ''.join(levels)
     if not case:
@@ -271,6 +317,9 @@ def fct_len(factor_series, decreasing=False):
     - pandas Series with updated categories.
     """
     levels = factor_series.cat.categories
+    if is_compact(levels):
+        order = np.argsort(LevelBuffer.of(levels).lengths())
+        return _reorder_codes(factor_series, order[::-1] if decreasing else order)
     lengths = levels.str.len()
     sorted_levels = levels[lengths.argsort()]
     if decreasing:
@@ -297,12 +346,20 @@ def fct_sort(factor_series, by, na_position='last'):
     return factor_series
 # fctutils/ordering.py
 
-def fct_sort_custom(factor_series, sort_func):
+def fct_sort_custom(factor_series, sort_func, n_jobs=1, executor='thread', cache=None):
     """
     Reorders the levels of a factor vector based on a custom function applied to each level.
+
+    sort_func takes the list of levels and returns one sort key per level. With n_jobs > 1
+    or a LevelCache as cache, it is called on batches of levels ('thread' or 'process'
+    workers) and keys are cached per level, so it must compute each key independently.
     """
     levels = factor_series.cat.categories.tolist()
-    sort_keys = sort_func(levels)
+    if n_jobs == 1 and cache is None:
+        sort_keys = sort_func(levels)
+    else:
+        sort_keys = map_levels(sort_func, levels, batched=True, n_jobs=n_jobs,
+                               executor=executor, cache=cache)
 
     df_levels = pd.DataFrame({'level': levels, 'sort_key': sort_keys})
     df_levels = df_levels.sort_values('sort_key')
@@ -313,34 +370,6 @@ def fct_sort_custom(factor_series, sort_func):
 
 # fctutils/ordering.py
 
-import pandas as pd
-
-def fct_lump_min(factor_series, min_count, other_level='Other'):
-    """
-    Lump levels that appear fewer than a specified number of times.
-
-    Parameters:
-    - factor_series: pandas Series with categorical dtype.
-    - min_count: Integer, minimum count a level must have to be kept.
-    - other_level: String, name of the lumped level.
-
-    Returns:
-    - pandas Series with updated categories.
-    """
-    if not pd.api.types.is_categorical_dtype(factor_series):
-        factor_series = factor_series.astype('category')
-
-    value_counts = factor_series.value_counts()
-    levels_to_keep = value_counts[value_counts >= min_count].index.tolist()
-
-    new_categories = levels_to_keep + [other_level]
-    factor_series = factor_series.cat.add_categories(other_level)
-    factor_series = factor_series.where(factor_series.isin(levels_to_keep), other_level)
-    factor_series = factor_series.cat.set_categories(new_categories)
-    return factor_series
-
-# fctutils/ordering.py
-
 def fct_shift(factor_series, positions=1):
     """
     Shift factor levels by a specified number of positions.
@@ -401,7 +430,7 @@ def fct_reverse(factor_series):
     return factor_series
 
 # fctutils/ordering.py
-def fct_lump_min(factor_series, min_count, other_level='Other'):
+def fct_lump_min(factor_series, min_count, other_level='Other', n_jobs=1):
     """
     Lump levels that appear fewer than a specified number of times.
 
@@ -409,6 +438,7 @@ def fct_lump_min(factor_series, min_count, other_level='Other'):
     - factor_series: pandas Series with categorical dtype.
     - min_count: Integer, minimum count a level must have to be kept.
     - other_level: String, name of the lumped level.
+    - n_jobs: Integer, number of worker processes used to rewrite the codes (-1 for all CPUs).
 
     Returns:
     - pandas Series with updated categories.
@@ -416,14 +446,110 @@ def fct_lump_min(factor_series, min_count, other_level='Other'):
     if not pd.api.types.is_categorical_dtype(factor_series):
         factor_series = factor_series.astype('category')
 
+    categories = factor_series.cat.categories
+    if other_level in categories:
+        raise ValueError(f"other_level '{other_level}' is already a category.")
+
     value_counts = factor_series.value_counts()
     levels_to_keep = value_counts[value_counts >= min_count].index.tolist()
-
     new_categories = levels_to_keep + [other_level]
-    factor_series = factor_series.cat.add_categories(other_level)
-    factor_series = factor_series.where(factor_series.isin(levels_to_keep), other_level)
-    factor_series = factor_series.cat.set_categories(new_categories)
-    return factor_series
+
+    # One lookup table from old codes to new codes; NA is lumped into other_level as well.
+    lut = np.full(len(categories) + 1, len(levels_to_keep), dtype=code_dtype(len(new_categories)))
+    lut[categories.get_indexer(levels_to_keep)] = np.arange(len(levels_to_keep))
+    codes = remap_codes(factor_series.cat.codes.to_numpy(), lut, n_jobs=n_jobs)
+    return from_codes(factor_series, codes, new_categories)
+
+
+def fct_lump_n(factor_series, n, other_level='Other', n_jobs=1):
+    """
+    Lump together all levels except the n most frequent ones.
+
+    Levels tied with the n-th most frequent level are kept as well. The kept levels are
+    ordered by decreasing count, followed by other_level. Missing values stay missing.
+
+    Parameters:
+    - factor_series: pandas Series with categorical dtype.
+    - n: Integer, number of most frequent levels to keep.
+    - other_level: String, name of the lumped level.
+    - n_jobs: Integer, number of worker processes used to count and rewrite the codes (-1 for all CPUs).
+
+    Returns:
+    - pandas Series with updated categories.
+    """
+    if not pd.api.types.is_categorical_dtype(factor_series):
+        factor_series = factor_series.astype('category')
+
+    codes = factor_series.cat.codes.to_numpy()
+    counts = count_codes(codes, len(factor_series.cat.categories), n_jobs=n_jobs)
+
+    return _lump_codes(factor_series, codes, counts, _keep_top_n(counts, n), other_level, n_jobs)
+
+
+def fct_lump_prop(factor_series, prop, other_level='Other', n_jobs=1):
+    """
+    Lump together levels that appear in at most a given proportion of the values.
+
+    The kept levels are ordered by decreasing count, followed by other_level.
+    Missing values stay missing and do not count towards the total.
+
+    Parameters:
+    - factor_series: pandas Series with categorical dtype.
+    - prop: Float between 0 and 1, levels with a proportion above prop are kept.
+    - other_level: String, name of the lumped level.
+    - n_jobs: Integer, number of worker processes used to count and rewrite the codes (-1 for all CPUs).
+
+    Returns:
+    - pandas Series with updated categories.
+    """
+    if not pd.api.types.is_categorical_dtype(factor_series):
+        factor_series = factor_series.astype('category')
+
+    codes = factor_series.cat.codes.to_numpy()
+    counts = count_codes(codes, len(factor_series.cat.categories), n_jobs=n_jobs)
+    return _lump_codes(factor_series, codes, counts, _keep_prop(counts, prop), other_level, n_jobs)
+
+
+def _keep_top_n(counts, n):
+    """
+    Boolean mask of the levels among the n most frequent ones, ties included.
+    """
+    if n <= 0:
+        return np.zeros(len(counts), dtype=bool)
+    if n >= len(counts):
+        return np.ones(len(counts), dtype=bool)
+    # Selection instead of a full sort: only the n-th largest count is needed.
+    threshold = counts[np.argpartition(-counts, n - 1)[n - 1]]
+    return counts >= threshold
+
+
+def _keep_prop(counts, prop):
+    """
+    Boolean mask of the levels whose share of the total count is above prop.
+    """
+    return counts > prop * counts.sum()
+
+
+def _lump_codes(factor_series, codes, counts, keep, other_level, n_jobs, lump_na=False):
+    """
+    Rewrite codes so that levels outside keep map to other_level, with one lookup table.
+
+    Missing values stay missing unless lump_na is True (as in fct_lump_min).
+    """
+    categories = factor_series.cat.categories
+    if other_level in categories:
+        raise ValueError(f"other_level '{other_level}' is already a category.")
+
+    kept_codes = np.flatnonzero(keep)
+    kept_codes = kept_codes[np.argsort(-counts[kept_codes], kind='stable')]
+    new_categories = categories[kept_codes].append(pd.Index([other_level]))
+
+    lut = np.full(len(categories) + 1, len(kept_codes), dtype=code_dtype(len(new_categories)))
+    lut[kept_codes] = np.arange(len(kept_codes))
+    if not lump_na:
+        lut[-1] = -1
+    codes = remap_codes(codes, lut, n_jobs=n_jobs)
+    return from_codes(factor_series, codes, new_categories)
 
 
 
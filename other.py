@@ -1,3 +1,9 @@
+# fctutils/other.py
+
+import pandas as pd
+
+from .levels import LevelIndex, is_compact
+
 def fct_insert(data, column=None, insert=None, target=None, position='after', allow_duplicates=False, inplace=False):
     """
     Inserts one or more new levels into a factor vector immediately after specified target levels.
@@ -19,22 +25,13 @@ def fct_insert(data, column=None, insert=None, target=None, position='after', al
     else:
         factor_series = data
 
-    levels = factor_series.cat.categories.tolist()
-
     if not isinstance(insert, list):
         insert = [insert]
     if not isinstance(target, list):
         target = [target]
 
-    for t, ins in zip(target, insert):
-        if ins in levels and not allow_duplicates:
-            levels.remove(ins)
-        try:
-            idx = levels.index(t)
-        except ValueError:
-            continue  # Target not found
-        insert_pos = idx + 1 if position == 'after' else idx
-        levels.insert(insert_pos, ins)
+    levels = _insert_levels(LevelIndex.of(factor_series.cat.categories), insert, target,
+                            position, allow_duplicates)
 
     factor_series = factor_series.cat.set_categories(levels, ordered=True)
 
@@ -53,6 +50,205 @@ def fct_insert(data, column=None, insert=None, target=None, position='after', al
         else:
             return factor_series
 
+def _insert_levels(index, insert, target, position, allow_duplicates):
+    """
+    Apply the insertions in order on a linked list over the level codes.
+
+    Each target lookup is a hash lookup, so the cost is O(levels + insertions)
+    instead of a list scan per insertion.
+    """
+    n = len(index)
+    # Node 0 is the head sentinel, nodes 1..n are the existing levels.
+    labels = [None] + index.categories.tolist()
+    next_node = list(range(1, n + 1)) + [0]
+    prev_node = [n] + list(range(n))
+    alive = [True] * (n + 1)
+    added = {}
+
+    def find(label):
+        node = index.get(label) + 1
+        if node > 0 and alive[node]:
+            return node
+        return added.get(label)
+
+    def unlink(node):
+        next_node[prev_node[node]] = next_node[node]
+        prev_node[next_node[node]] = prev_node[node]
+        alive[node] = False
+        added.pop(labels[node], None)
+
+    for t, ins in zip(target, insert):
+        node = find(ins)
+        if node is not None:
+            if allow_duplicates:
+                raise ValueError(f"Level '{ins}' already exists; categories must be unique.")
+            unlink(node)
+        anchor = find(t)
+        if anchor is None:
+            continue  # Target not found
+        if position != 'after':
+            anchor = prev_node[anchor]
+
+        node = len(labels)
+        labels.append(ins)
+        alive.append(True)
+        next_node.append(next_node[anchor])
+        prev_node.append(anchor)
+        prev_node[next_node[anchor]] = node
+        next_node[anchor] = node
+        added[ins] = node
+
+    levels = []
+    node = next_node[0]
+    while node != 0:
+        levels.append(labels[node])
+        node = next_node[node]
+    return levels
+
+
+def _levels_of(factor):
+    """
+    Levels of a categorical Series, a plain sequence (first-seen order) or an Arrow dictionary array.
+    """
+    if isinstance(factor, pd.Series) and pd.api.types.is_categorical_dtype(factor):
+        return factor.cat.categories
+    if isinstance(factor, (pd.Categorical, pd.CategoricalIndex)):
+        return factor.categories
+    if hasattr(factor, 'dictionary'):
+        return pd.Index(factor.dictionary.to_pandas())
+    if hasattr(factor, 'chunks') and hasattr(factor.type, 'value_type'):
+        chunk_levels = [_levels_of(chunk) for chunk in factor.chunks]
+        if not chunk_levels:
+            return pd.Index([], dtype=object)
+        return chunk_levels[0].append(chunk_levels[1:]).unique()
+    return pd.Index(pd.unique(pd.Series(factor).dropna()))
+
+
+def _translation(result, factor, input_levels):
+    """
+    Code translation of one input; one array per chunk for a chunked Arrow array,
+    since each chunk's codes index its own dictionary.
+    """
+    if hasattr(factor, 'chunks') and hasattr(factor.type, 'value_type'):
+        return [result.get_indexer(_levels_of(chunk)) for chunk in factor.chunks]
+    return result.get_indexer(input_levels)
+
+
+def _level_result(result, factors, levels, priority, return_codes):
+    """
+    Order the resulting levels, wrap them as a factor and build the code translations.
+    """
+    if priority is not None:
+        first = pd.Index(priority)
+        first = first[first.isin(result)].unique()
+        result = first.append(result[~result.isin(first)])
+
+    factor = pd.Series(pd.Categorical(result, categories=result))
+    if not return_codes:
+        return factor
+    # translations[i][code] is the result code of level `code` of input i (-1 if absent).
+    translations = [_translation(result, factor, input_levels) for factor, input_levels in zip(factors, levels)]
+    return factor, translations
+
+
+def fct_union(*factors, priority=None, return_codes=False):
+    """
+    Combines multiple factor vectors and returns a factor vector containing all unique levels.
+
+    Only the levels are used (hash-based, linear in the total number of levels);
+    the rows of the inputs are never touched.
+
+    Parameters:
+    - *factors: Categorical Series, sequences or Arrow dictionary arrays.
+    - priority: Optional list of levels placed first, in this order, when present.
+      The other levels keep their first-seen order.
+    - return_codes: Boolean, if True, also return one array per input mapping its
+      category codes to codes of the result (-1 if absent); for a chunked Arrow
+      array, a list with one such array per chunk.
+
+    Returns:
+    - pandas Series with categorical dtype holding each level once, or a tuple
+      (series, translations) if return_codes is True.
+    """
+    levels = [_levels_of(factor) for factor in factors]
+    if levels:
+        result = levels[0].append(levels[1:]).unique()
+    else:
+        result = pd.Index([], dtype=object)
+    return _level_result(result, factors, levels, priority, return_codes)
+
+
+def fct_intersect(*factors, priority=None, return_codes=False):
+    """
+    Returns a factor vector containing the levels present in every input, in the order of the first one.
+
+    Parameters:
+    - *factors: Categorical Series, sequences or Arrow dictionary arrays.
+    - priority: Optional list of levels placed first, in this order, when present.
+    - return_codes: Boolean, if True, also return per-input code translation arrays.
+
+    Returns:
+    - pandas Series with categorical dtype, or a tuple (series, translations).
+    """
+    levels = [_levels_of(factor) for factor in factors]
+    result = levels[0].unique() if levels else pd.Index([], dtype=object)
+    for other in levels[1:]:
+        result = result[result.isin(other)]
+    return _level_result(result, factors, levels, priority, return_codes)
+
+
+def fct_setdiff(*factors, priority=None, return_codes=False):
+    """
+    Returns a factor vector containing the levels of the first input that are in none of the others.
+
+    Parameters:
+    - *factors: Categorical Series, sequences or Arrow dictionary arrays.
+    - priority: Optional list of levels placed first, in this order, when present.
+    - return_codes: Boolean, if True, also return per-input code translation arrays.
+
+    Returns:
+    - pandas Series with categorical dtype, or a tuple (series, translations).
+    """
+    levels = [_levels_of(factor) for factor in factors]
+    result = levels[0].unique() if levels else pd.Index([], dtype=object)
+    if len(levels) > 1:
+        others = levels[1].append(levels[2:])
+        result = result[~result.isin(others)]
+    return _level_result(result, factors, levels, priority, return_codes)
+
+
+def fct_compact(factor_series):
+    """
+    Store the levels of a factor in Arrow, as one UTF-8 buffer plus an offsets array.
+
+    The codes are unchanged. fct_pos, fct_freq, fct_len, fct_filter_pos and fct_anon
+    then scan the levels through a LevelBuffer instead of per-level Python strings.
+    Requires pyarrow.
+
+    Parameters:
+    - factor_series: pandas Series with string levels.
+
+    Returns:
+    - pandas Series with categorical dtype and Arrow-backed string categories.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("fct_compact requires pyarrow.")
+
+    if not pd.api.types.is_categorical_dtype(factor_series):
+        factor_series = factor_series.astype('category')
+    categories = factor_series.cat.categories
+    if is_compact(categories):
+        return factor_series
+    if len(categories) and pd.api.types.infer_dtype(categories, skipna=False) != 'string':
+        raise ValueError("fct_compact requires string levels.")
+    categorical = pd.Categorical.from_codes(factor_series.cat.codes.to_numpy(),
+                                            categories=categories.astype('string[pyarrow]'),
+                                            ordered=factor_series.cat.ordered)
+    return pd.Series(categorical, index=factor_series.index, name=factor_series.name)
+
+
 def fct_pairs(elements, ref=None, symmetric=True, include_na=False,
               include_self=False, filter_fn=None, pre_process_fn=None):
     """
@@ -0,0 +1,379 @@
+# fctutils/parallel.py
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Below this many rows the cost of starting worker processes outweighs the gain.
+PARALLEL_MIN_ROWS = 1_000_000
+
+# Array params larger than this are passed to workers through shared memory.
+SHARED_PARAM_BYTES = 1 << 16
+
+
+def resolve_n_jobs(n_jobs):
+    """
+    Translate an n_jobs argument into a worker count.
+
+    Parameters:
+    - n_jobs: None or 1 for serial execution, -1 for all CPUs, or a positive integer.
+
+    Returns:
+    - Integer number of workers (at least 1).
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    return max(1, int(n_jobs))
+
+
+def code_dtype(n_categories):
+    """
+    Smallest signed integer dtype able to hold codes for n_categories levels (plus -1 for NA).
+    """
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def from_codes(factor_series, codes, categories, ordered=None):
+    """
+    Build a categorical Series from codes, keeping the index and name of factor_series.
+
+    Parameters:
+    - factor_series: pandas Series the result replaces.
+    - codes: Integer array of category codes (-1 for NA).
+    - categories: Categories of the new factor.
+    - ordered: Boolean, defaults to the ordered flag of factor_series.
+
+    Returns:
+    - pandas Series with categorical dtype.
+    """
+    if ordered is None:
+        ordered = factor_series.cat.ordered
+    categorical = pd.Categorical.from_codes(codes, categories=categories, ordered=ordered)
+    return pd.Series(categorical, index=factor_series.index, name=factor_series.name)
+
+
+def _take_kernel(out, arrays, lut):
+    # Codes of -1 index the last slot of lut, which holds the target for NA.
+    np.take(lut, arrays[0], out=out)
+    return out
+
+
+def _count_kernel(out, arrays, n_categories):
+    codes = arrays[0]
+    return np.bincount(codes[codes >= 0], minlength=n_categories)
+
+
+def _pair_kernel(out, arrays, n1, n2, lut=None):
+    codes1, codes2 = arrays
+    pairs = np.where(codes1 < 0, n1, codes1).astype(np.int64)
+    pairs *= n2 + 1
+    pairs += np.where(codes2 < 0, n2, codes2)
+    if lut is None:
+        return np.bincount(pairs, minlength=(n1 + 1) * (n2 + 1))
+    np.take(lut, pairs, out=out)
+    return out
+
+
+def _attach(spec):
+    name, dtype, length = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(length, dtype=dtype, buffer=shm.buf)
+
+
+def _worker(kernel, in_specs, out_spec, start, stop, params, param_specs):
+    blocks = [_attach(spec) for spec in in_specs]
+    arrays = [array[start:stop] for _, array in blocks]
+    params = dict(params)
+    for key, spec in param_specs.items():
+        blocks.append(_attach(spec))
+        params[key] = blocks[-1][1]
+    out = None
+    if out_spec is not None:
+        blocks.append(_attach(out_spec))
+        out = blocks[-1][1][start:stop]
+    try:
+        result = kernel(out, arrays, **params)
+        return None if out is not None else result
+    finally:
+        del arrays, params, out
+        for shm, _ in blocks:
+            shm.close()
+
+
+def _share(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(len(array), dtype=array.dtype, buffer=shm.buf)
+    view[:] = array
+    del view
+    return shm, (shm.name, array.dtype.str, len(array))
+
+
+def execute(kernel, arrays, out_dtype=None, n_jobs=1, min_rows=PARALLEL_MIN_ROWS, **params):
+    """
+    Run a row-level kernel over equally long arrays, serially or on a process pool.
+
+    In parallel mode the inputs and the output are placed in shared memory and each
+    worker processes one contiguous slice of rows. Large array params (lookup tables)
+    are shared the same way, so only slice bounds and small params are pickled.
+
+    Parameters:
+    - kernel: Module-level function kernel(out, arrays, **params).
+    - arrays: List of 1-D numpy arrays of the same length.
+    - out_dtype: dtype of the row-level output, or None if the kernel returns a partial result.
+    - n_jobs: Number of worker processes (see resolve_n_jobs).
+    - min_rows: Inputs shorter than this run serially.
+    - **params: Extra keyword arguments passed to the kernel.
+
+    Returns:
+    - The output array if out_dtype is given, else a list of partial results, one per slice.
+    """
+    arrays = [np.ascontiguousarray(array) for array in arrays]
+    n_rows = len(arrays[0])
+    n_jobs = min(resolve_n_jobs(n_jobs), max(1, n_rows))
+
+    if n_jobs == 1 or n_rows < min_rows:
+        out = None if out_dtype is None else np.empty(n_rows, dtype=out_dtype)
+        result = kernel(out, arrays, **params)
+        return out if out_dtype is not None else [result]
+
+    blocks = []
+    try:
+        in_specs = []
+        for array in arrays:
+            shm, spec = _share(array)
+            blocks.append(shm)
+            in_specs.append(spec)
+        small_params, param_specs = {}, {}
+        for key, value in params.items():
+            if isinstance(value, np.ndarray) and value.nbytes > SHARED_PARAM_BYTES:
+                shm, param_specs[key] = _share(value)
+                blocks.append(shm)
+            else:
+                small_params[key] = value
+        out_spec = None
+        if out_dtype is not None:
+            out_dtype = np.dtype(out_dtype)
+            shm = shared_memory.SharedMemory(create=True, size=max(n_rows * out_dtype.itemsize, 1))
+            blocks.append(shm)
+            out_spec = (shm.name, out_dtype.str, n_rows)
+
+        bounds = np.linspace(0, n_rows, n_jobs + 1).astype(np.int64)
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = [
+                pool.submit(_worker, kernel, in_specs, out_spec, int(start), int(stop),
+                            small_params, param_specs)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            results = [future.result() for future in futures]
+
+        if out_spec is None:
+            return results
+        return np.ndarray(n_rows, dtype=out_dtype, buffer=blocks[-1].buf).copy()
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def remap_codes(codes, lut, n_jobs=1, min_rows=PARALLEL_MIN_ROWS):
+    """
+    Rewrite category codes through a lookup table in one gather.
+
+    Parameters:
+    - codes: Integer array of category codes (-1 for NA).
+    - lut: Array with one entry per old category plus a final entry used for NA codes.
+    - n_jobs: Number of worker processes (see resolve_n_jobs).
+    - min_rows: Inputs shorter than this run serially.
+
+    Returns:
+    - numpy array of new codes, lut[codes].
+    """
+    lut = np.asarray(lut)
+    return execute(_take_kernel, [np.asarray(codes)], out_dtype=lut.dtype,
+                   n_jobs=n_jobs, min_rows=min_rows, lut=lut)
+
+
+def count_codes(codes, n_categories, n_jobs=1, min_rows=PARALLEL_MIN_ROWS):
+    """
+    Count the occurrences of each category code, ignoring NA codes.
+
+    Parameters:
+    - codes: Integer array of category codes (-1 for NA).
+    - n_categories: Number of categories.
+    - n_jobs: Number of worker processes (see resolve_n_jobs).
+    - min_rows: Inputs shorter than this run serially.
+
+    Returns:
+    - numpy array of length n_categories with the count of each code.
+    """
+    partials = execute(_count_kernel, [np.asarray(codes)], n_jobs=n_jobs,
+                       min_rows=min_rows, n_categories=n_categories)
+    return np.sum(partials, axis=0)
+
+
+def cross_codes(codes1, codes2, n1, n2, order=None, n_jobs=1, min_rows=PARALLEL_MIN_ROWS):
+    """
+    Combine two code arrays into codes over their observed pairs.
+
+    NA codes are treated as an extra level at position n1 (resp. n2).
+
+    Parameters:
+    - codes1, codes2: Integer code arrays of the same length.
+    - n1, n2: Number of categories behind codes1 and codes2.
+    - order: Optional function taking the observed pair ids (i * (n2 + 1) + j, increasing)
+      and returning the permutation that puts them in the desired category order.
+    - n_jobs: Number of worker processes (see resolve_n_jobs).
+    - min_rows: Inputs shorter than this run serially.
+
+    Returns:
+    - Tuple (pair_codes, observed) where pair_codes index into the (ordered) observed pair ids.
+    """
+    arrays = [np.asarray(codes1), np.asarray(codes2)]
+    n_pairs = (n1 + 1) * (n2 + 1)
+
+    if n_pairs > max(len(arrays[0]), 1 << 20):
+        # Pair space too large for a dense table: hash the observed pairs instead.
+        pairs = np.where(arrays[0] < 0, n1, arrays[0]).astype(np.int64) * (n2 + 1)
+        pairs += np.where(arrays[1] < 0, n2, arrays[1])
+        pair_codes, observed = pd.factorize(pairs, sort=True)
+        if order is None:
+            return pair_codes, observed
+        permutation = order(observed)
+        rank = np.empty(len(observed), dtype=code_dtype(len(observed)))
+        rank[permutation] = np.arange(len(observed))
+        return rank[pair_codes], observed[permutation]
+
+    counts = sum(execute(_pair_kernel, arrays, n_jobs=n_jobs, min_rows=min_rows, n1=n1, n2=n2))
+    observed = np.flatnonzero(counts)
+    if order is not None:
+        observed = observed[order(observed)]
+    lut = np.full(n_pairs, -1, dtype=code_dtype(len(observed)))
+    lut[observed] = np.arange(len(observed))
+    pair_codes = execute(_pair_kernel, arrays, out_dtype=lut.dtype, n_jobs=n_jobs,
+                         min_rows=min_rows, n1=n1, n2=n2, lut=lut)
+    return pair_codes, observed
+
+
+class LevelCache:
+    """
+    Bounded cache of callback results per level, evicting the least recently used.
+
+    Pass the same LevelCache to repeated calls that use the same callback, so only
+    levels not seen before are evaluated. A cache must not be shared between
+    different callbacks.
+
+    Parameters:
+    - maxsize: Integer, maximum number of levels kept.
+    """
+
+    def __init__(self, maxsize=100_000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, level):
+        return level in self._data
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def lookup(self, levels):
+        """
+        Cached results for levels.
+
+        Returns:
+        - Tuple (results, missing) where results has None for uncached levels and
+          missing lists their positions.
+        """
+        results = [None] * len(levels)
+        missing = []
+        with self._lock:
+            for i, level in enumerate(levels):
+                if level in self._data:
+                    self._data.move_to_end(level)
+                    results[i] = self._data[level]
+                else:
+                    missing.append(i)
+        return results, missing
+
+    def update(self, levels, results):
+        """
+        Store results for levels, evicting the oldest entries beyond maxsize.
+        """
+        with self._lock:
+            for level, result in zip(levels, results):
+                self._data[level] = result
+                self._data.move_to_end(level)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+def _call_each(func, batch):
+    return [func(level) for level in batch]
+
+
+def _call_batch(func, batch):
+    return list(func(batch))
+
+
+def map_levels(func, levels, batched=False, n_jobs=1, executor='thread', batch_size=1024, cache=None):
+    """
+    Evaluate a user callback over levels, in batches on a pool and with optional caching.
+
+    Parameters:
+    - func: Callback. Called on one level, or on a list of levels if batched is True
+      (it must then return one result per level, in order).
+    - levels: List of levels.
+    - batched: Boolean, if True, func takes a list of levels.
+    - n_jobs: Number of workers (see resolve_n_jobs); 1 evaluates in the calling thread.
+    - executor: 'thread' or 'process'. With 'process', func must be picklable.
+    - batch_size: Integer, number of levels per task.
+    - cache: Optional LevelCache; only levels missing from it are evaluated.
+
+    Returns:
+    - List of results, one per level.
+    """
+    if executor not in ('thread', 'process'):
+        raise ValueError("executor must be 'thread' or 'process'.")
+
+    levels = list(levels)
+    if cache is not None:
+        results, missing = cache.lookup(levels)
+        todo = [levels[i] for i in missing]
+    else:
+        results, missing, todo = None, None, levels
+
+    call = _call_batch if batched else _call_each
+    n_jobs = resolve_n_jobs(n_jobs)
+    if n_jobs == 1 or len(todo) <= batch_size:
+        computed = call(func, todo) if todo else []
+    else:
+        pool_class = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+        batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+        with pool_class(max_workers=n_jobs) as pool:
+            computed = [result for batch in pool.map(call, [func] * len(batches), batches)
+                        for result in batch]
+
+    if len(computed) != len(todo):
+        raise ValueError("The callback must return one result per level.")
+    if cache is None:
+        return computed
+
+    cache.update(todo, computed)
+    for i, result in zip(missing, computed):
+        results[i] = result
+    return results
@@ -0,0 +1,183 @@
+# fctutils/registry.py
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .parallel import code_dtype, remap_codes
+
+
+class Dictionary:
+    """
+    One version of a named, shared category set.
+
+    Factors bound to a dictionary share its categories object, so operations between
+    them can work on codes directly.
+
+    Parameters:
+    - name: String, name of the dictionary.
+    - version: Integer, version number (starting at 1).
+    - categories: Levels of this version.
+    - ordered: Boolean, whether bound factors are ordered.
+    """
+
+    def __init__(self, name, version, categories, ordered=False):
+        self.name = name
+        self.version = version
+        self.dtype = pd.CategoricalDtype(categories, ordered=ordered)
+        self.categories = self.dtype.categories
+        self._str_labels = None
+
+    def __repr__(self):
+        return f"Dictionary(name={self.name!r}, version={self.version}, levels={len(self.categories)})"
+
+    def __len__(self):
+        return len(self.categories)
+
+    @property
+    def str_labels(self):
+        """
+        The levels as a numpy array of strings, computed once per version.
+        """
+        if self._str_labels is None:
+            self._str_labels = self.categories.astype(str).to_numpy(dtype=object)
+        return self._str_labels
+
+    def from_codes(self, codes, index=None, name=None):
+        """
+        Build a factor bound to this dictionary from codes.
+        """
+        categorical = pd.Categorical.from_codes(codes, dtype=self.dtype)
+        return pd.Series(categorical, index=index, name=name)
+
+
+class DictionaryRegistry:
+    """
+    Named, versioned category sets that factors can be bound to.
+
+    Registering new categories under an existing name creates a new version.
+    Translation tables between versions (or dictionaries) are computed once and cached.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._by_categories = {}
+        self._translations = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, categories, ordered=False):
+        """
+        Register categories under name and return the resulting Dictionary.
+
+        If they equal the latest version, that version is returned unchanged.
+        """
+        categories = pd.Index(categories)
+        if categories.has_duplicates:
+            raise ValueError("Dictionary categories must be unique.")
+        with self._lock:
+            versions = self._versions.setdefault(name, [])
+            if versions and versions[-1].dtype.ordered == ordered and versions[-1].categories.equals(categories):
+                return versions[-1]
+            dictionary = Dictionary(name, len(versions) + 1, categories, ordered)
+            versions.append(dictionary)
+            self._by_categories[id(dictionary.categories)] = dictionary
+            return dictionary
+
+    def get(self, name, version=None):
+        """
+        A registered Dictionary, the latest version by default.
+        """
+        if name not in self._versions:
+            raise KeyError(f"No dictionary named '{name}'.")
+        versions = self._versions[name]
+        return versions[-1] if version is None else versions[version - 1]
+
+    def dictionary_of(self, factor_series):
+        """
+        The Dictionary a factor is bound to, or None.
+        """
+        if not pd.api.types.is_categorical_dtype(factor_series):
+            return None
+        categories = factor_series.cat.categories
+        dictionary = self._by_categories.get(id(categories))
+        if dictionary is not None and dictionary.categories is categories:
+            return dictionary
+        return None
+
+    def translation(self, source, target):
+        """
+        Lookup table from codes of source to codes of target (-1 where the level is absent).
+
+        The table has a final -1 entry for NA codes, as expected by remap_codes.
+        """
+        key = (source.name, source.version, target.name, target.version)
+        lut = self._translations.get(key)
+        if lut is None:
+            lut = np.append(target.categories.get_indexer(source.categories), -1)
+            lut = lut.astype(code_dtype(len(target)))
+            self._translations[key] = lut
+        return lut
+
+    def bind(self, factor_series, name, version=None, n_jobs=1):
+        """
+        Recode a factor onto a registered dictionary.
+
+        Parameters:
+        - factor_series: pandas Series.
+        - name: String, name of the dictionary.
+        - version: Integer, version to bind to (the latest by default).
+        - n_jobs: Integer, number of worker processes used to rewrite the codes.
+
+        Returns:
+        - pandas Series bound to the dictionary.
+        """
+        dictionary = self.get(name, version)
+        if not pd.api.types.is_categorical_dtype(factor_series):
+            factor_series = factor_series.astype('category')
+
+        source = self.dictionary_of(factor_series)
+        if source is dictionary:
+            return factor_series
+        if source is not None:
+            lut = self.translation(source, dictionary)
+        else:
+            lut = np.append(dictionary.categories.get_indexer(factor_series.cat.categories), -1)
+            lut = lut.astype(code_dtype(len(dictionary)))
+        used = factor_series.cat.categories[lut[:-1] < 0]
+        if len(used) and factor_series.isin(used).any():
+            raise ValueError(f"Levels {list(used[:10])} are not in dictionary '{name}'.")
+
+        codes = remap_codes(factor_series.cat.codes.to_numpy(), lut, n_jobs=n_jobs)
+        return dictionary.from_codes(codes, index=factor_series.index, name=factor_series.name)
+
+
+REGISTRY = DictionaryRegistry()
+
+
+def register_dictionary(name, categories, ordered=False):
+    """
+    Register a named category set in the global registry (see DictionaryRegistry.register).
+    """
+    return REGISTRY.register(name, categories, ordered)
+
+
+def get_dictionary(name, version=None):
+    """
+    A Dictionary of the global registry, the latest version by default.
+    """
+    return REGISTRY.get(name, version)
+
+
+def bind_dictionary(factor_series, name, version=None, n_jobs=1):
+    """
+    Recode a factor onto a dictionary of the global registry (see DictionaryRegistry.bind).
+    """
+    return REGISTRY.bind(factor_series, name, version, n_jobs=n_jobs)
+
+
+def dictionary_of(factor_series):
+    """
+    The Dictionary of the global registry a factor is bound to, or None.
+    """
+    return REGISTRY.dictionary_of(factor_series)
@@ -1,6 +1,14 @@
 # fctutils/replacing.py
 
-def fct_replace(data, column=None, old_level=None, new_level=None, position=None):
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from .levels import LevelBuffer, is_compact
+from .parallel import code_dtype, from_codes, remap_codes
+
+def fct_replace(data, column=None, old_level=None, new_level=None, position=None, mapping=None, n_jobs=1):
     """
     Replace a specified level in a factor vector with a new level.
 
@@ -10,6 +18,12 @@ def fct_replace(data, column=None, old_level=None, new_level=None, position=None
     - old_level: String, the level to replace.
     - new_level: String, the new level to insert.
     - position: Integer, position to place the new level among categories.
+    - mapping: Bulk old -> new rules instead of old_level/new_level: a dict, a Series
+      (index -> values), a DataFrame (first two columns) or a pair of sequences.
+      Rules for levels that are not present are ignored, levels mapped to the same
+      name are merged (at the position of the first one) and levels mapped to None
+      become missing. All rules are applied in a single pass over the codes.
+    - n_jobs: Integer, number of worker processes used to rewrite the codes (-1 for all CPUs).
 
     Returns:
     - pandas DataFrame or Series with updated categories.
@@ -22,9 +36,12 @@ def fct_replace(data, column=None, old_level=None, new_level=None, position=None
     if not pd.api.types.is_categorical_dtype(factor_series):
         factor_series = factor_series.astype('category')
 
-    factor_series = factor_series.cat.add_categories(new_level)
-    factor_series = factor_series.replace(old_level, new_level)
-    factor_series = factor_series.cat.remove_categories(old_level)
+    if mapping is not None:
+        if old_level is not None or position is not None:
+            raise ValueError("mapping cannot be combined with old_level or position.")
+        factor_series = _replace_many(factor_series, _as_mapping(mapping), n_jobs=n_jobs)
+    else:
+        factor_series = _collapse_levels(factor_series, [old_level], new_level, n_jobs=n_jobs)
 
     if position is not None:
         categories = factor_series.cat.categories.tolist()
@@ -39,9 +56,56 @@ def fct_replace(data, column=None, old_level=None, new_level=None, position=None
 
 
 
+def _as_mapping(mapping):
+    """
+    Normalize bulk replacement rules to a dict.
+    """
+    if isinstance(mapping, dict):
+        return mapping
+    if isinstance(mapping, pd.Series):
+        return dict(zip(mapping.index, mapping.to_numpy()))
+    if isinstance(mapping, pd.DataFrame):
+        if mapping.shape[1] < 2:
+            raise ValueError("A mapping DataFrame needs an old and a new level column.")
+        return dict(zip(mapping.iloc[:, 0], mapping.iloc[:, 1]))
+    old_levels, new_levels = mapping
+    return dict(zip(old_levels, new_levels))
+
+
+def _replace_many(factor_series, mapping, n_jobs=1):
+    """
+    Relabel the categories through mapping, in one hash join on the categories.
+    """
+    categories = factor_series.cat.categories
+    new_labels = categories.to_numpy(dtype=object, copy=True)
+    rule_index = categories.get_indexer(pd.Index(list(mapping.keys()), dtype=object))
+    found = rule_index >= 0
+    new_labels[rule_index[found]] = np.asarray(list(mapping.values()), dtype=object)[found]
+    return _relabel_levels(factor_series, new_labels, n_jobs=n_jobs)
+
+
+def _relabel_levels(factor_series, new_labels, n_jobs=1):
+    """
+    Give each category a new label, merging categories that end up with the same label.
+
+    Parameters:
+    - factor_series: pandas Series with categorical dtype.
+    - new_labels: Array with the new label of each category (NA removes the category).
+    - n_jobs: Integer, number of worker processes used to rewrite the codes.
+
+    Returns:
+    - pandas Series whose categories are the distinct new labels, in order of first appearance.
+    """
+    label_codes, new_categories = pd.factorize(np.asarray(new_labels, dtype=object))
+    lut = np.append(label_codes, -1).astype(code_dtype(len(new_categories)))
+    codes = remap_codes(factor_series.cat.codes.to_numpy(), lut, n_jobs=n_jobs)
+    return from_codes(factor_series, codes, new_categories)
+
+
+
 import re
 
-def fct_replace_pattern(data, column=None, pattern=None, replacement=None, regex=True, inplace=False):
+def fct_replace_pattern(data, column=None, pattern=None, replacement=None, regex=True, inplace=False, rules=None):
     """
     Replace parts of the factor levels that match a specified pattern with a new string.
 
@@ -52,6 +116,12 @@ def fct_replace_pattern(data, column=None, pattern=None, replacement=None, regex
     - replacement: String to replace the matched pattern.
     - regex: Boolean, if True, uses regex matching.
     - inplace: Boolean, if True, modify the data in place.
+    - rules: Ordered list of (pattern, replacement) or (pattern, replacement, regex) tuples
+      used instead of pattern/replacement; regex defaults to the regex argument.
+      Consecutive literal rules are compiled into one alternation and applied in a
+      single sweep (leftmost, then longest match wins); regex rules apply in order.
+
+    Levels that end up with the same name are merged.
 
     Returns:
     - pandas DataFrame or Series with updated categories.
@@ -61,15 +131,14 @@ def fct_replace_pattern(data, column=None, pattern=None, replacement=None, regex
     else:
         factor_series = data
 
-    levels = factor_series.cat.categories.tolist()
+    if rules is None:
+        rules = [(pattern, replacement, regex)]
 
-    if regex:
-        new_levels = [re.sub(pattern, replacement, level) for level in levels]
-    else:
-        new_levels = [level.replace(pattern, replacement) for level in levels]
+    new_levels = factor_series.cat.categories.tolist()
+    for rewrite in _compile_rules(rules, regex):
+        new_levels = [rewrite(level) for level in new_levels]
 
-    mapping = dict(zip(levels, new_levels))
-    factor_series = factor_series.cat.rename_categories(mapping)
+    factor_series = _relabel_levels(factor_series, new_levels)
 
     if inplace:
         if isinstance(data, pd.DataFrame):
@@ -87,13 +156,53 @@ def fct_replace_pattern(data, column=None, pattern=None, replacement=None, regex
             return factor_series
 
 
-def fct_anon(factor_series, prefix='Level'):
+def _compile_rules(rules, regex=True):
+    """
+    Compile ordered replacement rules into a list of level rewriting functions.
+
+    Runs of consecutive literal rules become one regex alternation with a table lookup,
+    so they cost a single sweep per level whatever their number.
+    """
+    steps = []
+    literals = {}
+
+    def flush():
+        if literals:
+            table = dict(literals)
+            # Longer patterns first, so the longest match wins at a given position.
+            alternation = re.compile('|'.join(
+                re.escape(literal) for literal in sorted(table, key=len, reverse=True)))
+            steps.append(lambda level: alternation.sub(lambda match: table[match.group(0)], level))
+            literals.clear()
+
+    for rule in rules:
+        rule_pattern, rule_replacement = rule[0], rule[1]
+        rule_regex = rule[2] if len(rule) > 2 else regex
+        if rule_regex:
+            flush()
+            compiled = re.compile(rule_pattern)
+            steps.append(lambda level, compiled=compiled, repl=rule_replacement: compiled.sub(repl, level))
+        elif rule_pattern:
+            literals.setdefault(rule_pattern, rule_replacement)
+        else:
+            # An empty literal matches everywhere; keep str.replace semantics for it.
+            flush()
+            steps.append(lambda level, repl=rule_replacement: level.replace('', repl))
+    flush()
+    return steps
+
+
+def fct_anon(factor_series, prefix='Level', key=None, digest_size=8):
     """
     Anonymize factor levels by replacing them with numeric codes.
 
     Parameters:
     - factor_series: pandas Series with categorical dtype.
     - prefix: String, prefix for the anonymized levels.
+    - key: Optional secret (bytes or string, at most 64 bytes). If given, each level is
+      replaced by prefix plus its keyed BLAKE2b hash, so the same level gets the same
+      label in every shard and run, without a shared dictionary.
+    - digest_size: Integer, number of hash bytes in the label when key is given.
 
     Returns:
     - pandas Series with anonymized categories.
@@ -102,14 +211,44 @@ def fct_anon(factor_series, prefix='Level'):
         factor_series = factor_series.astype('category')
 
     levels = factor_series.cat.categories
-    new_levels = [f"{prefix}{i+1}" for i in range(len(levels))]
+    if key is None:
+        new_levels = [f"{prefix}{i+1}" for i in range(len(levels))]
+    else:
+        new_levels = _keyed_labels(levels, prefix, key, digest_size)
+    if is_compact(levels):
+        # Same codes, new labels: keep the compact storage without building a level mapping.
+        return from_codes(factor_series, factor_series.cat.codes.to_numpy(), pd.Index(new_levels, dtype=levels.dtype))
     mapping = dict(zip(levels, new_levels))
     factor_series = factor_series.cat.rename_categories(mapping)
     return factor_series
 
+
+def _keyed_labels(levels, prefix, key, digest_size):
+    """
+    Keyed BLAKE2b labels for levels; raises if two levels share a label.
+    """
+    if isinstance(key, str):
+        key = key.encode('utf-8')
+    if is_compact(levels):
+        # Hash the UTF-8 bytes straight from the level buffer.
+        encoded = LevelBuffer.of(levels).slices()
+    else:
+        encoded = (str(level).encode('utf-8') for level in levels)
+    labels = [
+        prefix + hashlib.blake2b(data, key=key, digest_size=digest_size).hexdigest()
+        for data in encoded
+    ]
+    if len(set(labels)) != len(labels):
+        # Renumbering colliding levels would break stability across shards, so fail loudly.
+        collided = pd.Series(labels).duplicated(keep=False).to_numpy()
+        raise ValueError(
+            f"Hash collision between levels {list(levels[collided])}; use a larger digest_size."
+        )
+    return labels
+
 # fctutils/replacing.py
 
-def fct_collapse(factor_series, levels_to_collapse, new_level):
+def fct_collapse(factor_series, levels_to_collapse, new_level, n_jobs=1):
     """
     Collapse specified levels of a factor into a single new level.
 
@@ -117,6 +256,7 @@ def fct_collapse(factor_series, levels_to_collapse, new_level):
     - factor_series: pandas Series with categorical dtype.
     - levels_to_collapse: List of levels to collapse.
     - new_level: String, name of the new level.
+    - n_jobs: Integer, number of worker processes used to rewrite the codes (-1 for all CPUs).
 
     Returns:
     - pandas Series with updated categories.
@@ -124,8 +264,28 @@ def fct_collapse(factor_series, levels_to_collapse, new_level):
     if not pd.api.types.is_categorical_dtype(factor_series):
         factor_series = factor_series.astype('category')
 
-    factor_series = factor_series.cat.add_categories(new_level)
-    factor_series = factor_series.replace(levels_to_collapse, new_level)
-    factor_series = factor_series.cat.remove_categories(levels_to_collapse)
-    return factor_series
+    return _collapse_levels(factor_series, levels_to_collapse, new_level, n_jobs=n_jobs)
+
+
+def _collapse_levels(factor_series, old_levels, new_level, n_jobs=1):
+    """
+    Move old_levels into new_level, appended as the last category, with one pass over the codes.
+    """
+    categories = factor_series.cat.categories
+    if new_level in categories:
+        raise ValueError(f"new_level '{new_level}' is already a category.")
+    old_codes = categories.get_indexer(old_levels)
+    if (old_codes < 0).any():
+        missing = [level for level, code in zip(old_levels, old_codes) if code < 0]
+        raise ValueError(f"Levels {missing} are not categories of the factor.")
+
+    keep = np.ones(len(categories), dtype=bool)
+    keep[old_codes] = False
+    new_categories = categories[keep].append(pd.Index([new_level]))
+
+    lut = np.full(len(categories) + 1, -1, dtype=code_dtype(len(new_categories)))
+    lut[np.flatnonzero(keep)] = np.arange(keep.sum())
+    lut[old_codes] = len(new_categories) - 1
+    codes = remap_codes(factor_series.cat.codes.to_numpy(), lut, n_jobs=n_jobs)
+    return from_codes(factor_series, codes, new_categories)
 
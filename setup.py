@@ -12,6 +12,15 @@ setup(
     install_requires=[
         'pandas>=1.0.0',
     ],
+    extras_require={
+        'parquet': ['pyarrow'],
+        'sparse': ['scipy'],
+    },
+    entry_points={
+        'console_scripts': [
+            'fctutils=fctutils.cli:main',
+        ],
+    },
     classifiers=[
         'Programming Language :: Python :: 3',
         'License :: OSI Approved :: MIT License',
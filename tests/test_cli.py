@@ -0,0 +1,72 @@
+# tests/test_cli.py
+
+import os
+import tempfile
+import unittest
+import pandas as pd
+from fctutils.cli import fit, main, parse_op, parse_size
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+class TestCommandLineTool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.tmp.name, 'in.csv')
+        cities = ['Paris'] * 5 + ['paris'] * 3 + ['Rome'] * 4 + ['Oslo'] * 2 + [None]
+        pd.DataFrame({'city': cities, 'n': range(len(cities))}).to_csv(self.input, index=False)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_op_and_size(self):
+        column, op = parse_op('city:lump_n:n=2,other_level=Rest')
+        self.assertEqual(column, 'city')
+        self.assertEqual(op.kwargs, {'n': 2, 'other_level': 'Rest'})
+        with self.assertRaises(ValueError):
+            parse_op('city:lump_n')
+        with self.assertRaises(ValueError):
+            parse_op('city:unknown')
+        self.assertEqual(parse_size('512MB'), 512 << 20)
+        self.assertEqual(parse_size('2gb'), 2 << 30)
+        with self.assertRaises(ValueError):
+            parse_size('lots')
+
+    def test_fit_stateful_op_after_replace(self):
+        chains = {'city': [parse_op('city:replace:old=paris,new=Paris')[1], parse_op('city:count')[1]]}
+        fit(chains, self.input, 'csv', chunksize=4)
+        self.assertEqual(chains['city'][1].categories, ['Paris', 'Rome', 'Oslo'])
+
+    def test_csv_round_trip(self):
+        output = os.path.join(self.tmp.name, 'out.csv')
+        main([self.input, output, '--op', 'city:replace:old=paris,new=Paris',
+              '--op', 'city:lump_min:min_count=3', '--chunksize', '4', '--workers', '2'])
+        result = pd.read_csv(output)
+        self.assertEqual(result['n'].tolist(), list(range(15)))
+        self.assertEqual(result['city'].tolist(), ['Paris'] * 8 + ['Rome'] * 4 + ['Other'] * 3)
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_parquet_output_with_growing_categories(self):
+        path = os.path.join(self.tmp.name, 'many.csv')
+        output = os.path.join(self.tmp.name, 'out.parquet')
+        pd.DataFrame({'city': ['x'] * 1000 + [f'c{i}' for i in range(1000)]}).to_csv(path, index=False)
+        main([path, output, '--op', 'city:replace:old=x,new=y', '--chunksize', '1000'])
+        result = pd.read_parquet(output)
+        self.assertEqual(len(result), 2000)
+        self.assertEqual(result['city'].astype(str).tolist()[999:1001], ['y', 'c0'])
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_parquet_output_with_ordered_categories(self):
+        output = os.path.join(self.tmp.name, 'out.parquet')
+        main([self.input, output, '--op', 'city:count', '--chunksize', '4'])
+        result = pd.read_parquet(output)
+        self.assertEqual(len(result), 15)
+        self.assertTrue(result['city'].cat.ordered)
+        self.assertEqual(list(result['city'].cat.categories), ['Paris', 'Rome', 'paris', 'Oslo'])
+
+if __name__ == '__main__':
+    unittest.main()
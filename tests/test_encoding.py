@@ -0,0 +1,36 @@
+# tests/test_encoding.py
+
+import unittest
+import numpy as np
+import pandas as pd
+from fctutils import fct_onehot
+
+class TestFctOnehot(unittest.TestCase):
+
+    def test_matches_get_dummies(self):
+        color = pd.Series(['red', 'green', None, 'red'], dtype='category', name='color')
+        shape = pd.Series(['s', 't', 's', None], dtype='category', name='shape')
+        matrix, columns = fct_onehot(color, shape)
+        expected = pd.get_dummies(pd.DataFrame({'color': color, 'shape': shape}), dtype=np.uint8)
+        self.assertEqual(columns, list(expected.columns))
+        np.testing.assert_array_equal(matrix.toarray(), expected.to_numpy())
+
+    def test_interactions(self):
+        color = pd.Series(['red', 'green', None, 'red'], dtype='category', name='color')
+        shape = pd.Series(['s', 't', 's', None], dtype='category', name='shape')
+        matrix, columns = fct_onehot(color, shape, interactions=[(0, 1)])
+        self.assertEqual(columns[4:], ['color_green:shape_t', 'color_red:shape_s'])
+        np.testing.assert_array_equal(matrix.toarray()[:, 4:], [[0, 1], [1, 0], [0, 0], [0, 0]])
+
+    def test_many_columns_match_get_dummies(self):
+        rng = np.random.default_rng(0)
+        first = pd.Series(rng.integers(0, 100, 1000), name='a').astype(str).astype('category')
+        second = pd.Series(rng.integers(0, 100, 1000), name='b').astype(str).astype('category')
+        matrix, columns = fct_onehot(first, second)
+        expected = pd.get_dummies(pd.DataFrame({'a': first, 'b': second}), dtype=np.uint8)
+        self.assertEqual(matrix.nnz, 2000)
+        self.assertEqual(columns, list(expected.columns))
+        np.testing.assert_array_equal(matrix.toarray(), expected.to_numpy())
+
+if __name__ == '__main__':
+    unittest.main()
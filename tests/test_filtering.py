@@ -0,0 +1,27 @@
+# tests/test_filtering.py
+
+import unittest
+import pandas as pd
+from fctutils.filtering import fct_remove_levels
+
+class TestFilteringFunctions(unittest.TestCase):
+
+    def test_fct_remove_levels_modes(self):
+        factor_series = pd.Series(['apple', 'banana', None, 'cherry', 'banana'],
+                                  dtype='category', index=list('abcde'))
+
+        dropped = fct_remove_levels(factor_series, levels_to_remove=['banana'])
+        self.assertEqual(list(dropped.index), ['a', 'c', 'd'])
+        self.assertEqual(list(dropped.cat.categories), ['apple', 'cherry'])
+
+        as_na = fct_remove_levels(factor_series, levels_to_remove=['banana'], mode='na')
+        self.assertTrue(as_na.index.equals(factor_series.index))
+        self.assertEqual(as_na.isna().tolist(), [False, True, True, False, True])
+        self.assertEqual(list(as_na.cat.categories), ['apple', 'cherry'])
+
+        mask = fct_remove_levels(factor_series, levels_to_remove=['banana'], mode='mask')
+        self.assertEqual(mask.to_series().tolist(), [True, False, True, True, False])
+        self.assertTrue(mask.apply(factor_series).index.equals(dropped.index))
+
+if __name__ == '__main__':
+    unittest.main()
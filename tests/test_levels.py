@@ -0,0 +1,35 @@
+# tests/test_levels.py
+
+import unittest
+import pandas as pd
+from fctutils import fct_compact, fct_len, fct_pos
+from fctutils.levels import LevelBuffer, LevelIndex
+
+class TestLevelIndex(unittest.TestCase):
+
+    def test_lookups(self):
+        categories = pd.Index(['apple', 'apricot', 'banana', 'Avocado'])
+        index = LevelIndex.of(categories)
+        self.assertIs(LevelIndex.of(categories), index)
+        self.assertEqual(index.get('banana'), 2)
+        self.assertEqual(index.get_codes(['Avocado', 'kiwi']).tolist(), [3, -1])
+        self.assertEqual(index.prefix_codes('ap').tolist(), [0, 1])
+        self.assertEqual(index.char_mask([1], 'a').tolist(), [True, True, False, True])
+        self.assertEqual(index.char_mask([1], 'a', case=True).tolist(), [True, True, False, False])
+
+class TestLevelBuffer(unittest.TestCase):
+
+    def test_compact_scans(self):
+        factor_series = pd.Series(['banana', 'Apple', 'kiwi', None, 'café'], dtype='category')
+        compact = fct_compact(factor_series)
+        buffer = LevelBuffer.of(compact.cat.categories)
+        self.assertIs(LevelBuffer.of(compact.cat.categories), buffer)
+        self.assertEqual(buffer.lengths().tolist(), [5, 6, 4, 4])
+        self.assertEqual(buffer.char_mask([1], 'a').tolist(), [True, False, False, False])
+        self.assertEqual(list(fct_len(compact).cat.categories), list(fct_len(factor_series).cat.categories))
+        reordered = fct_pos(compact, [2])
+        self.assertEqual(list(reordered.cat.categories), ['banana', 'café', 'kiwi', 'Apple'])
+        self.assertEqual(reordered.astype(object).tolist()[:3], ['banana', 'Apple', 'kiwi'])
+
+if __name__ == '__main__':
+    unittest.main()
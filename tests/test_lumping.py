@@ -0,0 +1,51 @@
+# tests/test_lumping.py
+
+import unittest
+import pandas as pd
+from fctutils import fct_lump_n, fct_lump_prop
+from fctutils.ordering import fct_lump_min
+
+class TestLumpingFunctions(unittest.TestCase):
+
+    def setUp(self):
+        self.factor_series = pd.Series(['a', 'a', 'a', 'b', 'b', 'c', 'c', 'd', None], dtype='category')
+
+    def test_fct_lump_n_keeps_ties(self):
+        lumped = fct_lump_n(self.factor_series, n=2)
+        self.assertEqual(list(lumped.cat.categories), ['a', 'b', 'c', 'Other'])
+        self.assertEqual(lumped.tolist()[:8], ['a', 'a', 'a', 'b', 'b', 'c', 'c', 'Other'])
+        self.assertTrue(pd.isna(lumped[8]))
+
+    def test_fct_lump_n_bounds(self):
+        none_kept = fct_lump_n(self.factor_series, n=0)
+        self.assertEqual(list(none_kept.cat.categories), ['Other'])
+        self.assertEqual(none_kept.tolist()[:8], ['Other'] * 8)
+        all_kept = fct_lump_n(self.factor_series, n=10)
+        self.assertEqual(list(all_kept.cat.categories), ['a', 'b', 'c', 'd', 'Other'])
+        self.assertEqual(all_kept.tolist()[:8], self.factor_series.tolist()[:8])
+        self.assertTrue(pd.isna(all_kept[8]))
+
+    def test_fct_lump_prop_is_strict(self):
+        # 'b' and 'c' make up exactly 2/8 of the non-missing values.
+        lumped = fct_lump_prop(self.factor_series, prop=0.25)
+        self.assertEqual(list(lumped.cat.categories), ['a', 'Other'])
+        self.assertEqual(lumped.tolist()[:8], ['a'] * 3 + ['Other'] * 5)
+        self.assertTrue(pd.isna(lumped[8]))
+        lumped = fct_lump_prop(self.factor_series, prop=0.2)
+        self.assertEqual(list(lumped.cat.categories), ['a', 'b', 'c', 'Other'])
+
+    def test_existing_other_level_raises(self):
+        with self.assertRaises(ValueError):
+            fct_lump_n(self.factor_series, n=1, other_level='d')
+        with self.assertRaises(ValueError):
+            fct_lump_prop(self.factor_series, prop=0.1, other_level='a')
+
+    def test_fct_lump_min_lumps_missing_values(self):
+        lumped = fct_lump_min(self.factor_series, min_count=2)
+        self.assertEqual(list(lumped.cat.categories), ['a', 'b', 'c', 'Other'])
+        self.assertEqual(lumped.tolist(), ['a', 'a', 'a', 'b', 'b', 'c', 'c', 'Other', 'Other'])
+        with self.assertRaises(ValueError):
+            fct_lump_min(self.factor_series, min_count=2, other_level='d')
+
+if __name__ == '__main__':
+    unittest.main()
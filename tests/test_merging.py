@@ -0,0 +1,18 @@
+# tests/test_merging.py
+
+import unittest
+import pandas as pd
+from fctutils.merging import fct_cross
+
+class TestMergingFunctions(unittest.TestCase):
+
+    def test_fct_cross_missing_values_and_duplicate_labels(self):
+        # 'a_b' x 'c' and 'a' x 'b_c' both give the label 'a_b_c' and are merged.
+        factor1 = pd.Series(['a_b', 'a', None, 'a'], dtype='category')
+        factor2 = pd.Series(['c', 'b_c', 'c', None], dtype='category')
+        crossed = fct_cross(factor1, factor2)
+        self.assertEqual(list(crossed.cat.categories), ['a_b_c', 'a_nan', 'nan_c'])
+        self.assertEqual(crossed.tolist(), ['a_b_c', 'a_b_c', 'nan_c', 'a_nan'])
+
+if __name__ == '__main__':
+    unittest.main()
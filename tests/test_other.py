@@ -0,0 +1,56 @@
+# tests/test_other.py
+
+import unittest
+import pandas as pd
+from fctutils.other import fct_insert, fct_union, fct_intersect, fct_setdiff
+
+class TestOtherFunctions(unittest.TestCase):
+
+    def test_level_set_operations(self):
+        factor_vec1 = pd.Series(['apple', 'banana'], dtype='category')
+        factor_vec2 = pd.Series(['banana', 'cherry'], dtype='category')
+        factor_vec3 = pd.Series(['date', 'apple'], dtype='category')
+
+        union_series, translations = fct_union(factor_vec1, factor_vec2, factor_vec3, return_codes=True)
+        self.assertEqual(list(union_series.cat.categories), ['apple', 'banana', 'cherry', 'date'])
+        self.assertEqual([t.tolist() for t in translations], [[0, 1], [1, 2], [0, 3]])
+
+        self.assertEqual(fct_intersect(factor_vec1, factor_vec2).tolist(), ['banana'])
+        self.assertEqual(fct_setdiff(factor_vec1, factor_vec2, factor_vec3).tolist(), [])
+        self.assertEqual(fct_union(factor_vec1, factor_vec2, priority=['cherry']).tolist(),
+                         ['cherry', 'apple', 'banana'])
+
+    def test_chunked_arrow_translations(self):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            self.skipTest('pyarrow is not installed')
+        chunked = pa.chunked_array([pa.array(['y', 'z', 'y']).dictionary_encode(),
+                                    pa.array(['w']).dictionary_encode()])
+        union_series, translations = fct_union(pd.Series(['x', 'w'], dtype='category'), chunked,
+                                               return_codes=True)
+        self.assertEqual(list(union_series.cat.categories), ['w', 'x', 'y', 'z'])
+        self.assertEqual(translations[0].tolist(), [0, 1])
+        self.assertEqual([t.tolist() for t in translations[1]], [[2, 3], [0]])
+
+    def test_fct_insert(self):
+        factor_series = pd.Series(['a', 'b', 'c'], dtype='category')
+
+        def levels(**kwargs):
+            return list(fct_insert(factor_series, **kwargs).cat.categories)
+
+        self.assertEqual(levels(insert='x', target='b'), ['a', 'b', 'x', 'c'])
+        self.assertEqual(levels(insert='x', target='b', position='before'), ['a', 'x', 'b', 'c'])
+        # An existing level is moved.
+        self.assertEqual(levels(insert='a', target='c'), ['b', 'c', 'a'])
+        # A missing target leaves the levels unchanged.
+        self.assertEqual(levels(insert='x', target='zz'), ['a', 'b', 'c'])
+        # Later insertions can target levels added earlier in the same call.
+        self.assertEqual(levels(insert=['x', 'y'], target=['a', 'x']), ['a', 'x', 'y', 'b', 'c'])
+        self.assertEqual(levels(insert=['x', 'y'], target=['a', 'x'], position='before'),
+                         ['y', 'x', 'a', 'b', 'c'])
+        with self.assertRaises(ValueError):
+            fct_insert(factor_series, insert='a', target='c', allow_duplicates=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+# tests/test_parallel.py
+
+import unittest
+import numpy as np
+import pandas as pd
+from fctutils import fct_filter_func, fct_sort_custom
+from fctutils.parallel import LevelCache, map_levels, remap_codes, cross_codes
+
+class TestParallelEngine(unittest.TestCase):
+
+    def test_remap_codes_parallel_matches_serial(self):
+        codes = np.array([0, 2, -1, 1, 2, 0, -1, 1], dtype=np.int8)
+        lut = np.array([1, 0, 1, -1], dtype=np.int8)
+        serial = remap_codes(codes, lut)
+        parallel = remap_codes(codes, lut, n_jobs=2, min_rows=0)
+        self.assertEqual(serial.tolist(), [1, 1, -1, 0, 1, 1, -1, 0])
+        self.assertEqual(parallel.tolist(), serial.tolist())
+
+    def test_cross_codes_parallel_matches_serial(self):
+        codes1 = np.array([0, 1, 0, -1, 1], dtype=np.int8)
+        codes2 = np.array([1, 1, 1, 0, 0], dtype=np.int8)
+        pair_codes, observed = cross_codes(codes1, codes2, 2, 2)
+        parallel_codes, parallel_observed = cross_codes(codes1, codes2, 2, 2, n_jobs=2, min_rows=0)
+        self.assertEqual(observed.tolist(), [1, 3, 4, 6])
+        self.assertEqual(pair_codes.tolist(), [0, 2, 0, 3, 1])
+        self.assertEqual(parallel_codes.tolist(), pair_codes.tolist())
+        self.assertEqual(parallel_observed.tolist(), observed.tolist())
+
+class TestLevelCallbacks(unittest.TestCase):
+
+    def test_map_levels_batches_and_cache(self):
+        calls = []
+
+        def func(level):
+            calls.append(level)
+            return level.upper()
+
+        levels = [f'l{i}' for i in range(10)]
+        cache = LevelCache()
+        self.assertEqual(map_levels(func, levels, n_jobs=2, batch_size=3, cache=cache),
+                         [level.upper() for level in levels])
+        self.assertEqual(sorted(calls), sorted(levels))
+
+        calls.clear()
+        overlapping = levels[5:] + ['new1', 'new2']
+        self.assertEqual(map_levels(func, overlapping, n_jobs=2, batch_size=3, cache=cache),
+                         [level.upper() for level in overlapping])
+        self.assertEqual(sorted(calls), ['new1', 'new2'])
+
+    def test_map_levels_batched_and_process_executor(self):
+        levels = ['a', 'bb', 'ccc', 'dddd', 'eeeee']
+        batch_sizes = []
+
+        def func(batch):
+            batch_sizes.append(len(batch))
+            return [len(level) for level in batch]
+
+        self.assertEqual(map_levels(func, levels, batched=True, n_jobs=2, batch_size=2), [1, 2, 3, 4, 5])
+        self.assertEqual(sorted(batch_sizes), [1, 2, 2])
+        self.assertEqual(map_levels(len, levels, n_jobs=2, executor='process', batch_size=2), [1, 2, 3, 4, 5])
+        with self.assertRaises(ValueError):
+            map_levels(len, levels, executor='fork')
+
+    def test_level_cache_evicts_least_recently_used(self):
+        cache = LevelCache(maxsize=2)
+        cache.update(['a', 'b'], [1, 2])
+        self.assertEqual(cache.lookup(['a']), ([1], []))
+        cache.update(['c'], [3])
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.lookup(['a', 'b', 'c']), ([1, None, 3], [1]))
+
+    def test_fct_filter_func_reuses_cache(self):
+        calls = []
+
+        def keep(level):
+            calls.append(level)
+            return level != 'banana'
+
+        cache = LevelCache()
+        factor_series = pd.Series(['apple', 'banana', 'cherry', 'banana'], dtype='category')
+        filtered = fct_filter_func(factor_series, keep, n_jobs=2, cache=cache)
+        self.assertEqual(filtered.tolist(), ['apple', 'cherry'])
+        self.assertEqual(sorted(calls), ['apple', 'banana', 'cherry'])
+
+        calls.clear()
+        other = pd.Series(['cherry', 'date', 'banana'], dtype='category')
+        self.assertEqual(fct_filter_func(other, keep, cache=cache).tolist(), ['cherry', 'date'])
+        self.assertEqual(calls, ['date'])
+
+    def test_fct_sort_custom_batched_matches_unbatched(self):
+        factor_series = pd.Series(['kiwi', 'banana', 'fig', 'apple', 'cherry'], dtype='category')
+
+        def sort_func(levels):
+            return [level[::-1] for level in levels]
+
+        expected = list(fct_sort_custom(factor_series, sort_func).cat.categories)
+        cache = LevelCache()
+        batched = fct_sort_custom(factor_series, sort_func, n_jobs=2, cache=cache)
+        self.assertEqual(list(batched.cat.categories), expected)
+        self.assertEqual(len(cache), 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+# tests/test_registry.py
+
+import unittest
+import pandas as pd
+from fctutils.merging import fct_concat, fct_match
+from fctutils.registry import DictionaryRegistry, REGISTRY
+
+class TestDictionaryRegistry(unittest.TestCase):
+
+    def test_versions_and_translation(self):
+        registry = DictionaryRegistry()
+        v1 = registry.register('fruit', ['apple', 'banana'])
+        self.assertIs(registry.register('fruit', ['apple', 'banana']), v1)
+        v2 = registry.register('fruit', ['banana', 'cherry', 'apple'])
+        self.assertEqual(v2.version, 2)
+        self.assertEqual(registry.translation(v1, v2).tolist(), [2, 0, -1])
+
+        bound = registry.bind(pd.Series(['banana', None, 'apple']), 'fruit', version=1)
+        self.assertIs(registry.dictionary_of(bound), v1)
+        rebound = registry.bind(bound, 'fruit')
+        self.assertIs(registry.dictionary_of(rebound), v2)
+        self.assertEqual(rebound.cat.codes.tolist(), [0, -1, 2])
+
+    def test_bound_factors_concat_and_match_on_codes(self):
+        REGISTRY.register('test_colors', ['red', 'green', 'blue'])
+        colors1 = REGISTRY.bind(pd.Series(['red', 'blue']), 'test_colors')
+        colors2 = REGISTRY.bind(pd.Series(['green']), 'test_colors')
+        combined = fct_concat(colors1, colors2)
+        self.assertIs(REGISTRY.dictionary_of(combined), REGISTRY.get('test_colors'))
+        self.assertEqual(combined.tolist(), ['red', 'blue', 'green'])
+        matched = fct_match(colors1, colors2)
+        self.assertIsNot(matched, colors1)
+        self.assertIs(REGISTRY.dictionary_of(matched), REGISTRY.get('test_colors'))
+        self.assertEqual(matched.tolist(), ['red', 'blue'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+# tests/test_replacing.py
+
+import unittest
+import pandas as pd
+from fctutils.replacing import fct_anon, fct_collapse, fct_replace, fct_replace_pattern
+
+class TestReplacingFunctions(unittest.TestCase):
+
+    def test_fct_anon_keyed_is_stable_across_shards(self):
+        shard1 = pd.Series(['apple', 'banana', 'cherry'], dtype='category')
+        shard2 = pd.Series(['cherry', 'date', 'apple'], dtype='category')
+        anon1 = fct_anon(shard1, key='secret')
+        anon2 = fct_anon(shard2, key='secret')
+        self.assertEqual(anon1[0], anon2[2])
+        self.assertEqual(anon1[2], anon2[0])
+        self.assertNotEqual(anon1[0], fct_anon(shard1, key='other')[0])
+
+    def test_fct_replace_mapping_merges_levels(self):
+        factor_series = pd.Series(['apple', 'banana', 'cherry', 'date', None], dtype='category')
+        replaced = fct_replace(factor_series, mapping={'cherry': 'stone', 'date': 'stone', 'kiwi': 'x'})
+        self.assertEqual(list(replaced.cat.categories), ['apple', 'banana', 'stone'])
+        self.assertEqual(replaced.tolist()[:4], ['apple', 'banana', 'stone', 'stone'])
+        self.assertTrue(pd.isna(replaced[4]))
+
+    def test_fct_replace_pattern_rules_merge_levels(self):
+        factor_series = pd.Series(['apple_pie', 'apple_tart', 'cherry_cake'], dtype='category')
+        rules = [('_pie', '', False), ('_tart', '', False), (r'_\w+$', '', True)]
+        replaced = fct_replace_pattern(factor_series, rules=rules)
+        self.assertEqual(list(replaced.cat.categories), ['apple', 'cherry'])
+        self.assertEqual(replaced.tolist(), ['apple', 'apple', 'cherry'])
+
+    def test_fct_collapse_and_replace_validate_levels(self):
+        factor_series = pd.Series(['x', 'y', 'z', None], dtype='category')
+        collapsed = fct_collapse(factor_series, ['x', 'z'], 'xz')
+        self.assertEqual(list(collapsed.cat.categories), ['y', 'xz'])
+        self.assertEqual(collapsed.tolist()[:3], ['xz', 'y', 'xz'])
+        self.assertTrue(pd.isna(collapsed[3]))
+        with self.assertRaises(ValueError):
+            fct_collapse(factor_series, ['x', 'w'], 'n')
+        with self.assertRaises(ValueError):
+            fct_collapse(factor_series, ['x'], 'y')
+        with self.assertRaises(ValueError):
+            fct_replace(factor_series, old_level='w', new_level='q')
+        with self.assertRaises(ValueError):
+            fct_replace(factor_series, old_level='x', new_level='y')
+
+if __name__ == '__main__':
+    unittest.main()
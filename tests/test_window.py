@@ -0,0 +1,32 @@
+# tests/test_window.py
+
+import unittest
+import pandas as pd
+from fctutils.window import WindowedCounts
+
+class TestWindowedCounts(unittest.TestCase):
+
+    def test_add_and_evict(self):
+        window = WindowedCounts(['a', 'b', 'c'], n_buckets=2)
+        window.add(pd.Series(['a', 'a', 'b'], dtype='category'))
+        window.advance()
+        window.add(['c', 'c', 'c', 'd', None])
+        self.assertEqual(window.counts().to_dict(), {'a': 2, 'b': 1, 'c': 3, 'd': 1})
+        self.assertEqual(window.top_k(2), ['c', 'a'])
+
+        window.advance()
+        self.assertEqual(window.order(), ['c', 'd', 'a', 'b'])
+        lumped = window.lump_min(pd.Series(['a', 'c', 'd'], dtype='category'), min_count=2)
+        self.assertEqual(list(lumped.cat.categories), ['c', 'Other'])
+        self.assertEqual(lumped.tolist(), ['Other', 'c', 'Other'])
+
+    def test_lump_min_lumps_missing_values(self):
+        window = WindowedCounts([], n_buckets=1)
+        window.add(['a', 'a', 'b', None])
+        factor_series = pd.Series(['a', None, 'b'], dtype='category')
+        lumped = window.lump_min(factor_series, min_count=2)
+        self.assertEqual(list(lumped.cat.categories), ['a', 'Other'])
+        self.assertEqual(lumped.tolist(), ['a', 'Other', 'Other'])
+
+if __name__ == '__main__':
+    unittest.main()
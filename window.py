@@ -0,0 +1,143 @@
+# fctutils/window.py
+
+import numpy as np
+import pandas as pd
+
+from .ordering import _lump_codes
+
+
+class WindowedCounts:
+    """
+    Level frequencies over a sliding window of time buckets.
+
+    Each bucket holds the bincount of the batches added while it was current. The
+    buckets form a ring buffer, so advancing the window evicts the oldest bucket by
+    subtracting its counts. Every update and query costs O(levels), independent of the
+    number of rows in the window. Levels not seen before are added as they appear.
+
+    Parameters:
+    - categories: Initial levels (pandas Index or list).
+    - n_buckets: Integer, number of buckets in the window (e.g. minutes).
+    """
+
+    def __init__(self, categories, n_buckets):
+        if n_buckets < 1:
+            raise ValueError("n_buckets must be at least 1.")
+        self.categories = pd.Index(categories)
+        self.n_buckets = n_buckets
+        self._buckets = np.zeros((n_buckets, len(self.categories)), dtype=np.int64)
+        self._totals = np.zeros(len(self.categories), dtype=np.int64)
+        self._current = 0
+
+    def add(self, values):
+        """
+        Count a batch of values into the current bucket.
+
+        Parameters:
+        - values: Categorical Series or Categorical, or any sequence of levels.
+        """
+        if isinstance(values, pd.Series):
+            values = values.array
+        if not isinstance(values, pd.Categorical):
+            values = pd.Categorical(values)
+
+        codes = values.codes
+        batch_counts = np.bincount(codes[codes >= 0], minlength=len(values.categories))
+        if values.categories is self.categories or values.categories.equals(self.categories):
+            positions = slice(None)
+        else:
+            # Categories are unique, so the positions are too and += is safe.
+            positions = self._positions(values.categories)
+        self._buckets[self._current, positions] += batch_counts
+        self._totals[positions] += batch_counts
+
+    def advance(self, steps=1):
+        """
+        Move the window forward by steps buckets, evicting the oldest ones.
+        """
+        for _ in range(min(steps, self.n_buckets)):
+            self._current = (self._current + 1) % self.n_buckets
+            self._totals -= self._buckets[self._current]
+            self._buckets[self._current] = 0
+
+    def counts(self):
+        """
+        Count of each level in the window, in category order.
+        """
+        return pd.Series(self._totals.copy(), index=self.categories, name='count')
+
+    def value_counts(self, decreasing=True):
+        """
+        Counts sorted like Series.value_counts().
+        """
+        order = self._order(self._totals, decreasing)
+        return pd.Series(self._totals[order], index=self.categories[order], name='count')
+
+    def order(self, decreasing=True):
+        """
+        Levels in order of window frequency, as fct_count would order them.
+        """
+        return self.categories[self._order(self._totals, decreasing)].tolist()
+
+    def top_k(self, k):
+        """
+        The k most frequent levels in the window, most frequent first.
+        """
+        k = min(k, len(self.categories))
+        if k <= 0:
+            return []
+        top = np.argpartition(-self._totals, k - 1)[:k]
+        top = top[self._order(self._totals[top], True)]
+        return self.categories[top].tolist()
+
+    def lump_set(self, min_count):
+        """
+        Levels with at least min_count occurrences in the window, most frequent first.
+        """
+        kept = np.flatnonzero(self._totals >= min_count)
+        kept = kept[self._order(self._totals[kept], True)]
+        return self.categories[kept].tolist()
+
+    def reorder(self, factor_series, decreasing=True):
+        """
+        Reorder the levels of factor_series by window frequency, like fct_count.
+        """
+        if not pd.api.types.is_categorical_dtype(factor_series):
+            factor_series = factor_series.astype('category')
+        categories = factor_series.cat.categories
+        counts = self._counts_for(categories)
+        new_categories = categories[self._order(counts, decreasing)]
+        return factor_series.cat.reorder_categories(new_categories, ordered=True)
+
+    def lump_min(self, factor_series, min_count, other_level='Other'):
+        """
+        Lump the levels of factor_series that appear fewer than min_count times in the window.
+
+        The result has the same shape as fct_lump_min: kept levels by decreasing window
+        count, followed by other_level, and missing values are lumped into other_level too.
+        """
+        if not pd.api.types.is_categorical_dtype(factor_series):
+            factor_series = factor_series.astype('category')
+        counts = self._counts_for(factor_series.cat.categories)
+        return _lump_codes(factor_series, factor_series.cat.codes.to_numpy(), counts,
+                           counts >= min_count, other_level, n_jobs=1, lump_na=True)
+
+    @staticmethod
+    def _order(counts, decreasing):
+        return np.argsort(-counts if decreasing else counts, kind='stable')
+
+    def _counts_for(self, categories):
+        positions = self.categories.get_indexer(categories)
+        totals = np.append(self._totals, 0)
+        return totals[positions]
+
+    def _positions(self, categories):
+        positions = self.categories.get_indexer(categories)
+        new = positions < 0
+        if new.any():
+            n_old = len(self.categories)
+            self.categories = self.categories.append(categories[new])
+            self._buckets = np.pad(self._buckets, ((0, 0), (0, int(new.sum()))))
+            self._totals = np.pad(self._totals, (0, int(new.sum())))
+            positions[new] = np.arange(n_old, len(self.categories))
+        return positions